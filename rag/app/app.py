@@ -6,9 +6,18 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
 from langchain_core.messages.chat import ChatMessage
-from core.graph import build_graph
+from core.app_context import get_app_context
+
+# 스트리밍 중 화면 갱신 간격(초). 매 토큰 전체 답변을 다시 그리면 긴 답변에서 O(n²)이 됨
+STREAM_RENDER_INTERVAL = 0.05
 
 st.set_page_config(page_title="Energy-gpt", layout="wide")
+
+# 그래프/DB 풀/LLM 클라이언트는 서버 프로세스당 한 번만 생성 (스크립트 재실행·세션 간 공유)
+@st.cache_resource(show_spinner="앱을 준비하고 있습니다...")
+def app_context():
+    return get_app_context()
+
 st.title("Energy-gpt에 오신걸 환영합니다.")
 
 # 대화 저장소 초기화
@@ -33,8 +42,8 @@ user_input = st.chat_input("궁금한 내용을 물어보세요!")
 if user_input:
     st.chat_message("user").write(user_input)
 
-    # LangGraph 실행
-    graph = build_graph()
+    # LangGraph 실행 (컴파일된 그래프 재사용)
+    graph = app_context().graph
     ai_answer = ""
 
     with st.chat_message("assistant"):
@@ -66,6 +75,7 @@ if user_input:
         final_output = {}
         node_messages = {
             "router": "🔍 질문을 분석하고 있습니다...",
+            "answer_cache": "♻️ 비슷한 질문의 답변을 찾고 있습니다...",
             "retriever": "📚 관련 문서를 검색하고 있습니다...",
             "supervisor": "🤔 전문가를 선택하고 있습니다...",
             "energy_industry_agent": "⚡ 에너지산업분석전문가가 분석하고 있습니다...",
@@ -74,39 +84,45 @@ if user_input:
             "explainer": "🎯 최종 답변을 정리하고 있습니다...",
         }
         
+        # updates: 노드 진행 상황 / custom: nodes/llm.py가 보내는 LLM 토큰
+        answer_parts: list[str] = []
+        phase = None
+        last_render = 0.0
         try:
-            for chunk in graph.stream({"query": user_input, "history": history}):
+            for mode, chunk in graph.stream({"query": user_input, "history": history},
+                                            stream_mode=["updates", "custom"]):
+                if mode == "custom":
+                    if chunk.get("start"):
+                        # 성찰 단계가 시작되면 초안을 지우고 개선본을 새로 스트리밍
+                        if phase is not None and chunk["phase"] != phase:
+                            answer_parts = []
+                        phase = chunk["phase"]
+                        continue
+                    answer_parts.append(chunk.get("token", ""))
+                    # 토큰마다 다시 그리지 않고 STREAM_RENDER_INTERVAL마다 한 번만 갱신
+                    now = time.monotonic()
+                    if now - last_render >= STREAM_RENDER_INTERVAL:
+                        container.markdown("".join(answer_parts) + "▊", unsafe_allow_html=True)
+                        last_render = now
+                    continue
                 for node_name, node_output in chunk.items():
                     if node_name in node_messages:
                         thinking_container.markdown(
                             f"<small style='color: gray;'>{node_messages[node_name]}</small>", 
                             unsafe_allow_html=True
                         )
-                    final_output.update(node_output)
+                    final_output.update(node_output or {})
         except Exception as e:
             thinking_container.markdown(
                 f"<small style='color: red;'>⚠️ 처리 중 오류가 발생했습니다: {str(e)}</small>", 
                 unsafe_allow_html=True
             )
             final_output = {"final": "죄송합니다. 답변 생성 중 오류가 발생했습니다."}
-        
-        # 타자기 효과로 최종 답변 표시
-        ai_answer = final_output.get("final", "답변을 생성할 수 없습니다.")
-        thinking_container.markdown(
-            f"<small style='color: gray;'>💬 답변을 출력하고 있습니다...</small>", 
-            unsafe_allow_html=True
-        )
-        
-        # 타자기 효과
-        displayed_text = ""
-        for i, char in enumerate(ai_answer):
-            displayed_text += char
-            container.markdown(displayed_text + "▊", unsafe_allow_html=True)
-            if i % 3 == 0:  # 3글자마다 업데이트
-                time.sleep(0.01)
-        
+
+        # explainer가 참고 문서 목록을 붙인 최종 답변으로 한 번 교체
+        ai_answer = final_output.get("final") or "".join(answer_parts) or "답변을 생성할 수 없습니다."
         thinking_container.empty()  # 생각 중 메시지 제거
-        container.markdown(ai_answer, unsafe_allow_html=True)  # 최종 커서 제거
+        container.markdown(ai_answer, unsafe_allow_html=True)  # 커서 제거
         
         # 최종 output을 out 변수에 할당 (기존 코드와 호환성 유지)
         out = final_output
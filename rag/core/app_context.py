@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+프로세스당 한 번만 만드는 앱 리소스: 컴파일된 그래프를 보관하고, DB 풀과 OpenAI/Ollama 클라이언트를 미리 만들어 둔다.
+풀/클라이언트 자체는 노드가 쓰는 get_pool()/core.clients 싱글턴이 유일한 출처이고, 여기서는 첫 질문 전에 데워 두기만 한다.
+Streamlit은 상호작용마다 스크립트를 다시 실행하므로 app.py는 st.cache_resource로 이 객체를 감싸 재사용한다.
+
+시작/메시지당 오버헤드 측정:
+    python core/app_context.py                      # 콜드 생성, 재사용, build_graph() 1회 비용
+    python core/app_context.py --query "2024년 정제마진 전망"   # 질문 2회 실행 (첫 토큰까지 시간 포함)
+    python core/app_context.py --query "..." --async          # async 그래프(build_graph(async_mode=True))를 astream으로
+"""
+import os
+import sys
+import time
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.settings import PROVIDER
+
+@dataclass
+class AppContext:
+    graph: Any                    # 컴파일된 LangGraph (실행마다 state가 따로라 세션 간 공유 가능)
+    timings: dict = field(default_factory=dict)   # 생성 단계별 소요 시간(초)
+
+_context: AppContext | None = None
+_lock = threading.Lock()
+
+def _build() -> AppContext:
+    from core.graph import build_graph
+    from core.clients import get_openai, get_http_session
+    from db.pool import get_pool
+
+    timings = {}
+    t0 = time.perf_counter()
+    graph = build_graph()
+    timings["graph_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    pool = get_pool()  # 노드는 get_pool()로 같은 풀을 사용
+    try:
+        pool.wait(timeout=10.0)  # min_size 연결이 준비될 때까지 (첫 질문에서 연결 비용을 내지 않도록)
+    except Exception as e:
+        # DB가 늦게 뜨는 경우에도 앱은 시작하고, 연결은 첫 검색 때 다시 시도
+        print(f"⚠️ DB 풀 준비 실패 (첫 검색 시 재시도): {e}")
+    timings["pool_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    get_openai()  # 임베딩은 항상 OpenAI (router/llm 노드가 같은 싱글턴 사용)
+    if PROVIDER == "ollama":
+        get_http_session()
+    timings["clients_s"] = time.perf_counter() - t0
+
+    print("🚀 앱 컨텍스트 준비: " + ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
+    return AppContext(graph=graph, timings=timings)
+
+def get_app_context() -> AppContext:
+    """현재 프로세스의 앱 컨텍스트 (처음 호출할 때 생성)"""
+    global _context
+    if _context is None:
+        with _lock:
+            if _context is None:
+                _context = _build()
+    return _context
+
+# ------------------ 오버헤드 측정 ------------------
+def _run_query(graph, query: str) -> tuple[float, float | None]:
+    """질문 1회 → (전체 시간, 첫 토큰까지 시간)"""
+    t0 = time.perf_counter()
+    first_token = None
+    for mode, chunk in graph.stream({"query": query, "history": []}, stream_mode=["updates", "custom"]):
+        if mode == "custom" and first_token is None and chunk.get("token"):
+            first_token = time.perf_counter() - t0
+    return time.perf_counter() - t0, first_token
+
+async def _arun_query(graph, query: str) -> tuple[float, float | None]:
+    """_run_query의 async 버전 (router/retriever는 async 노드, 나머지는 LangGraph executor에서 실행)"""
+    t0 = time.perf_counter()
+    first_token = None
+    async for mode, chunk in graph.astream({"query": query, "history": []}, stream_mode=["updates", "custom"]):
+        if mode == "custom" and first_token is None and chunk.get("token"):
+            first_token = time.perf_counter() - t0
+    return time.perf_counter() - t0, first_token
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="앱 컨텍스트 생성/재사용 오버헤드 측정")
+    parser.add_argument("--repeat", type=int, default=5, help="build_graph() 반복 측정 횟수")
+    parser.add_argument("--query", help="지정하면 같은 컨텍스트로 질문을 2회 실행해 시간 측정")
+    parser.add_argument("--async", dest="async_mode", action="store_true",
+                        help="질문을 async 그래프로 실행 (회차마다 asyncio.run → 루프별 DB 풀/OpenAI 클라이언트)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    ctx = get_app_context()
+    cold = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        get_app_context()
+    warm_us = (time.perf_counter() - t0) / 1000 * 1e6
+
+    # 메시지마다 build_graph()를 부르던 이전 방식의 비용
+    from core.graph import build_graph
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        build_graph()
+    rebuild_ms = (time.perf_counter() - t0) / args.repeat * 1000
+
+    print("\n📊 앱 컨텍스트 오버헤드")
+    print(f"  최초 생성 (콜드)      : {cold * 1000:,.0f} ms  {', '.join(f'{k}={v * 1000:.0f}ms' for k, v in ctx.timings.items())}")
+    print(f"  재사용 (get_app_context): {warm_us:.2f} µs/회")
+    print(f"  build_graph() 1회     : {rebuild_ms:,.1f} ms (이전: 메시지마다 발생)")
+
+    if args.query:
+        agraph = build_graph(async_mode=True) if args.async_mode else None
+        for i in (1, 2):
+            total, ttft = asyncio.run(_arun_query(agraph, args.query)) if agraph else \
+                _run_query(ctx.graph, args.query)
+            print(f"  질문 {i}회차           : 전체 {total:,.2f}s"
+                  + (f", 첫 토큰 {ttft:,.2f}s" if ttft is not None else " (캐시 적중, 토큰 없음)"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+import asyncio
+import threading
+import requests
+from core.settings import OPENAI_API_KEY
+
+# 프로세스당 하나씩 쓰는 외부 API 클라이언트 (연결 풀/keep-alive 재사용).
+# router(임베딩)와 nodes/llm.py(채팅)가 같은 인스턴스를 사용한다.
+
+_lock = threading.Lock()
+_openai_client = None
+# AsyncOpenAI의 httpx 연결은 만든 이벤트 루프에 묶이므로 async 풀(db/pool.py)처럼 (pid, 루프)마다 하나씩 둔다.
+# asyncio.run을 다시 호출하면(스크립트, Streamlit 재실행) 새 루프에서 새 클라이언트를 쓴다.
+_async_openai_clients: dict[tuple[int, int], object] = {}
+_http_session = None
+
+def get_openai():
+    global _openai_client
+    if _openai_client is None:
+        with _lock:
+            if _openai_client is None:
+                from openai import OpenAI
+                _openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    return _openai_client
+
+def get_async_openai():
+    """현재 이벤트 루프의 async 클라이언트 (httpx 기반, 이벤트 루프를 막지 않음)"""
+    key = (os.getpid(), id(asyncio.get_running_loop()))
+    client = _async_openai_clients.get(key)
+    if client is None:
+        from openai import AsyncOpenAI
+        client = _async_openai_clients[key] = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    return client
+
+def get_http_session() -> requests.Session:
+    """Ollama 호출용 keep-alive 세션"""
+    global _http_session
+    if _http_session is None:
+        with _lock:
+            if _http_session is None:
+                _http_session = requests.Session()
+    return _http_session
@@ -40,3 +40,74 @@ OLLAMA_CHAT_MODEL  = os.getenv("OLLAMA_CHAT_MODEL", "llama3.1:8b")
 
 # Embedding dimension must match DB schema
 EMBED_DIM = int(os.getenv("EMBED_DIM", "1536"))
+
+# Batch embedding (ingestion)
+EMBED_BATCH_MAX_TOKENS = int(os.getenv("EMBED_BATCH_MAX_TOKENS", "100000"))  # 요청 1건당 토큰 상한
+EMBED_BATCH_MAX_ITEMS = int(os.getenv("EMBED_BATCH_MAX_ITEMS", "512"))        # 요청 1건당 입력 개수 상한
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))                  # 동시에 보내는 요청 수
+
+# Ingestion writer: COPY 포맷 (binary | text)
+INGEST_COPY_FORMAT = os.getenv("INGEST_COPY_FORMAT", "binary").lower()
+
+# Embedding cache (SQLite, 로컬 디스크)
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE_ENABLED", "true").lower() == "true"
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", ".cache/embeddings.sqlite")
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "500000"))  # 1536-d 기준 약 3GB
+EMBED_CACHE_TOUCH_SECONDS = float(os.getenv("EMBED_CACHE_TOUCH_SECONDS", "600"))  # 이보다 오래된 항목만 last_used 갱신
+
+# 테이블 후보 페이지 선별 방식: drawings (벡터 괘선 분석) | find_tables (PyMuPDF) | off (전체 페이지)
+TABLE_PRESCREEN = os.getenv("TABLE_PRESCREEN", "drawings").lower()
+
+# HNSW index build parameters
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))
+
+# Bulk load (--bulk): 인덱스 재생성 시 세션 설정
+BULK_MAINTENANCE_WORK_MEM = os.getenv("BULK_MAINTENANCE_WORK_MEM", "2GB")
+BULK_PARALLEL_WORKERS = int(os.getenv("BULK_PARALLEL_WORKERS", "4"))
+
+# Connection pool (psycopg_pool)
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))                  # 연결 대기 최대 시간(초)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))  # 쿼리 최대 실행 시간
+
+# Vector distance metric: cosine | l2 | ip (인덱스 opclass와 검색 연산자를 함께 결정)
+VECTOR_METRIC = os.getenv("VECTOR_METRIC", "cosine").lower()
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))                      # 검색 시 후보 리스트 크기
+VECTOR_INDEX_CHECK = os.getenv("VECTOR_INDEX_CHECK", "true").lower() == "true"  # 첫 검색 전에 EXPLAIN으로 인덱스 사용 확인
+
+# Hybrid retrieval (pg_trgm + vector, Reciprocal Rank Fusion)
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "auto").lower()          # auto | always | never
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "40"))       # 각 순위 목록에서 가져올 후보 수
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Metadata-filtered ANN: pgvector 0.8+ iterative index scan (off | strict_order | relaxed_order)
+HNSW_ITERATIVE_SCAN = os.getenv("HNSW_ITERATIVE_SCAN", "off").lower()
+
+# Compact vector storage (pgvector 0.7+)
+VECTOR_STORAGE = os.getenv("VECTOR_STORAGE", "vector").lower()      # vector(float4) | halfvec(float2)
+VECTOR_INDEX_MODE = os.getenv("VECTOR_INDEX_MODE", "full").lower()  # full | binary (binary_quantize HNSW + 재정렬)
+RERANK_FACTOR = int(os.getenv("RERANK_FACTOR", "4"))                # binary 1차 검색에서 k × N개 후보를 정밀 거리로 재정렬
+
+# Retrieval result cache (in-process, invalidated by ingest via corpus_generation)
+RETRIEVAL_CACHE_ENABLED = os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+RETRIEVAL_CACHE_TTL = float(os.getenv("RETRIEVAL_CACHE_TTL", "600"))                # 초
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "2048"))
+CORPUS_GENERATION_CHECK_SECONDS = float(os.getenv("CORPUS_GENERATION_CHECK_SECONDS", "1.0"))  # 세대 번호 재확인 주기
+
+# Semantic answer cache (answer_cache table, cosine similarity on query embeddings)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))    # 코사인 유사도 이상이면 재사용
+ANSWER_CACHE_TTL_HOURS = float(os.getenv("ANSWER_CACHE_TTL_HOURS", "24"))
+ANSWER_CACHE_SAME_GENERATION = os.getenv("ANSWER_CACHE_SAME_GENERATION", "false").lower() == "true"  # 새 리포트 적재 시에도 무효화
+
+# MMR diversification (k × MMR_FETCH_FACTOR 후보를 가져와 중복이 적은 k개 선택)
+MMR_ENABLED = os.getenv("MMR_ENABLED", "true").lower() == "true"
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))             # 1.0이면 관련도만, 낮을수록 다양성 우선
+MMR_FETCH_FACTOR = int(os.getenv("MMR_FETCH_FACTOR", "3"))
+
+# Structured table engine (structured_tables → DataFrame, 계산 결과만 프롬프트에 전달)
+TABLE_ENGINE_ENABLED = os.getenv("TABLE_ENGINE_ENABLED", "true").lower() == "true"
+TABLE_FRAME_CACHE_SIZE = int(os.getenv("TABLE_FRAME_CACHE_SIZE", "512"))   # 파싱한 DataFrame 캐시 개수
+TABLE_CONTEXT_ROWS = int(os.getenv("TABLE_CONTEXT_ROWS", "6"))             # 표마다 프롬프트에 넣을 최대 행 수
@@ -4,12 +4,18 @@ class QAState(TypedDict, total=False):
     query: str
     query_embedding: List[float]
     category: str
+    categories: List[str]           # 검색할 파티션 (여러 개면 fan-out)
+    hybrid: bool                    # 어휘+벡터 하이브리드 검색 여부
+    filters: Dict[str, Any]         # 연도/출처/증권사 메타데이터 필터
     candidates: List[Dict[str, Any]]
+    context: str                    # 에이전트 프롬프트 컨텍스트 (표는 계산 결과로 대체, 성찰에서 재사용)
     intent: Dict[str, Any]
     route: str
     result: Dict[str, Any]          # agent 1회 실행 결과
     partials: List[Dict[str, Any]]  # 누적된 결과
     final: str                      # supervisor가 합성한 최종 답변
+    cache_hit: bool                 # 답변 캐시 재사용 여부
+    answer_cache_id: int
     target_years: List[int]         # 연도 필터링
     history: List[Dict[str, Any]]   # 대화 히스토리
     analysis_intent: Dict[str, Any] # 분석 의도
@@ -0,0 +1,88 @@
+import json
+import psycopg
+from core.settings import EMBED_DIM, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_TTL_HOURS
+from db.pool import get_pool
+
+# 의미 기반 답변 캐시: 질문 임베딩(cosine) → 최종 답변 + 근거 청크.
+# 조회는 (파티션, 필터, TTL) 범위 안의 소수 항목을 정확히 비교하는 스캔이라 벡터 인덱스를 두지 않는다 (lookup).
+# 문서 저장 형식(VECTOR_STORAGE)과 무관하게 작은 테이블이라 vector 타입/코사인 거리로 고정한다.
+# 근거 파일이 재적재/삭제되면 해당 항목을 지운다 (ingest/manifest.py).
+
+def ensure_answer_cache_table(conn: psycopg.Connection):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS answer_cache (
+            id bigserial PRIMARY KEY,
+            query text NOT NULL,
+            query_embedding vector({EMBED_DIM}) NOT NULL,
+            categories text[] NOT NULL,
+            filters jsonb NOT NULL DEFAULT '{{}}',
+            final text NOT NULL,
+            evidence jsonb NOT NULL DEFAULT '[]',
+            evidence_ids bigint[] NOT NULL DEFAULT '{{}}',
+            evidence_files text[] NOT NULL DEFAULT '{{}}',
+            generations jsonb NOT NULL DEFAULT '{{}}',
+            hits int NOT NULL DEFAULT 0,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            last_hit_at timestamptz
+        )
+    """)
+    # lookup이 사용하지 않는 HNSW 인덱스는 store()마다 유지 비용만 들어 제거
+    conn.execute("DROP INDEX IF EXISTS idx_answer_cache_embedding")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_answer_cache_files ON answer_cache USING gin (evidence_files)")
+    # lookup의 (파티션, 필터, TTL) 조건을 먼저 좁히는 btree
+    conn.execute("""CREATE INDEX IF NOT EXISTS idx_answer_cache_scope
+                    ON answer_cache (categories, filters, created_at)""")
+
+def invalidate_files(cur, filenames: list[str]) -> int:
+    """근거로 쓴 파일이 바뀌거나 삭제되면 그 파일을 인용한 캐시 답변 삭제"""
+    cur.execute("DELETE FROM answer_cache WHERE evidence_files && %s::text[]", (list(filenames),))
+    return cur.rowcount
+
+def _filters_json(filters: dict | None) -> str:
+    # 같은 조건이면 같은 JSON이 되도록 정렬 (jsonb 비교)
+    return json.dumps({k: sorted(v) for k, v in (filters or {}).items() if v}, ensure_ascii=False, sort_keys=True)
+
+def lookup(embedding: list[float], categories: list[str], filters: dict | None) -> dict | None:
+    """
+    같은 파티션/필터 조건에서 가장 가까운 캐시 답변. 유사도가 임계값 미만이거나 TTL이 지났으면 None.
+    HNSW로 전체에서 가까운 순으로 뽑은 뒤 조건을 거르면 다른 조건의 항목이 ef_search 후보를 채워
+    적중할 답변을 놓치므로, 조건에 맞는 항목을 btree로 먼저 좁히고(TTL 안의 소수) 그 안에서 정확히 비교한다.
+    """
+    try:
+        with get_pool().connection() as conn:
+            row = conn.execute(
+                """WITH scoped AS MATERIALIZED (
+                       SELECT id, query, final, evidence, generations, query_embedding
+                       FROM answer_cache
+                       WHERE categories = %(cats)s AND filters = %(filters)s::jsonb
+                         AND created_at > now() - make_interval(secs => %(ttl)s * 3600)
+                   )
+                   SELECT id, query, final, evidence, generations,
+                          1 - (query_embedding <=> %(emb)s::vector) AS similarity
+                   FROM scoped
+                   ORDER BY similarity DESC
+                   LIMIT 1""",
+                {"emb": embedding, "cats": categories, "filters": _filters_json(filters),
+                 "ttl": ANSWER_CACHE_TTL_HOURS},
+            ).fetchone()
+            if row is None or row[5] < ANSWER_CACHE_THRESHOLD:
+                return None
+            conn.execute("UPDATE answer_cache SET hits = hits + 1, last_hit_at = now() WHERE id = %s", (row[0],))
+    except psycopg.errors.UndefinedTable:
+        return None
+    return {"id": row[0], "query": row[1], "final": row[2], "evidence": row[3],
+            "generations": row[4], "similarity": float(row[5])}
+
+def store(query: str, embedding: list[float], categories: list[str], filters: dict | None,
+          final: str, evidence: list[dict], generations: dict[str, int] | None):
+    with get_pool().connection() as conn:
+        conn.execute(
+            """INSERT INTO answer_cache
+                 (query, query_embedding, categories, filters, final, evidence, evidence_ids, evidence_files, generations)
+               VALUES (%s, %s::vector, %s, %s::jsonb, %s, %s::jsonb, %s, %s, %s::jsonb)""",
+            (query, embedding, categories, _filters_json(filters), final,
+             json.dumps(evidence, ensure_ascii=False, default=str),
+             [e["id"] for e in evidence if e.get("id") is not None],
+             sorted({e["filename"] for e in evidence if e.get("filename")}),
+             json.dumps({c: (generations or {}).get(c, 0) for c in categories})),
+        )
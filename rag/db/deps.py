@@ -1,41 +1,529 @@
 
+import re
+import time
+from datetime import date
 import psycopg
-from core.settings import DB_URL
-
-def vector_search(category: str, embedding: list[float], k: int = 8):
-    with psycopg.connect(DB_URL) as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """SELECT content, page, filename, chunk_type FROM documents WHERE category = %s 
-                   ORDER BY embedding <=> %s::vector LIMIT %s""",
-                (category, embedding, k),
-            )
+from psycopg import sql
+from core.settings import (
+    HNSW_EF_SEARCH, VECTOR_INDEX_CHECK, EMBED_DIM, RRF_K, HYBRID_CANDIDATES, HNSW_ITERATIVE_SCAN,
+    RERANK_FACTOR, RETRIEVAL_CACHE_ENABLED, MMR_ENABLED, MMR_FETCH_FACTOR,
+)
+from db.pool import get_pool, get_async_pool
+from db.partitions import existing_categories, EXISTING_CATEGORIES_SQL
+from db import retrieval_cache
+from db.generation import GENERATION_SQL
+from db.mmr import mmr_select
+from db.vector_ops import operator, vector_type, binary_index, quantized
+
+_COLUMNS = sql.SQL("content, page, filename, chunk_type, id")
+# MMR용: 바깥 SELECT에서만 real[]로 변환 (파티션 서브쿼리는 원래 타입 그대로 전달)
+_EMB_COLUMNS = (sql.SQL("content, page, filename, chunk_type, id, embedding"),
+                sql.SQL("content, page, filename, chunk_type, id, embedding::real[]"))
+
+# ------------------ 메타데이터 필터 ------------------
+def _year_ranges(years: list[int]) -> list[tuple[int, int]]:
+    """[2023, 2024, 2026] → [(2023, 2025), (2026, 2027)] (연속 연도는 하나의 범위로)"""
+    ranges = []
+    for y in sorted(set(years)):
+        if ranges and ranges[-1][1] == y:
+            ranges[-1] = (ranges[-1][0], y + 1)
+        else:
+            ranges.append((y, y + 1))
+    return ranges
+
+def has_filters(filters: dict | None) -> bool:
+    return bool(filters) and any(filters.values())
+
+def filter_sql(filters: dict | None) -> sql.Composable:
+    """
+    {"years": [...], "sources": [...], "brokers": [...]} → " AND ..." 조건.
+    report_date는 범위 조건으로 만들어야 B-tree 인덱스를 사용할 수 있음
+    """
+    parts = []
+    if filters and filters.get("years"):
+        parts.append(sql.SQL("({})").format(sql.SQL(" OR ").join(
+            sql.SQL("(report_date >= {} AND report_date < {})").format(
+                sql.Literal(date(a, 1, 1)), sql.Literal(date(b, 1, 1)))
+            for a, b in _year_ranges(filters["years"])
+        )))
+    if filters and filters.get("sources"):
+        parts.append(sql.SQL("source = ANY({})").format(sql.Literal(list(filters["sources"]))))
+    if filters and filters.get("brokers"):
+        parts.append(sql.SQL("broker = ANY({})").format(sql.Literal(list(filters["brokers"]))))
+    return sql.SQL("").join(sql.SQL(" AND ") + p for p in parts)
+
+_BROKERS_SQL = "SELECT DISTINCT broker FROM documents WHERE broker IS NOT NULL"
+_BROKER_TTL = 300.0
+_brokers: tuple[float, list[str]] | None = None
+
+def _brokers_stale() -> bool:
+    return _brokers is None or time.monotonic() - _brokers[0] > _BROKER_TTL
+
+def _set_brokers(rows) -> list[str]:
+    global _brokers
+    brokers = sorted((r[0] for r in rows), key=len, reverse=True)
+    _brokers = (time.monotonic(), brokers)
+    return brokers
+
+def known_brokers() -> list[str]:
+    """적재된 리포트의 증권사 목록 (질의에서 증권사 이름을 찾는 데 사용, 실행 중 새로 적재된 증권사도 잡도록 5분 캐시)"""
+    if _brokers_stale():
+        with get_pool().connection() as conn:
+            return _set_brokers(conn.execute(_BROKERS_SQL).fetchall())
+    return _brokers[1]
+
+# ------------------ 파티션 ------------------
+_CATEGORY_TTL = 60.0
+_categories: tuple[float, list[str]] | None = None
+
+def _categories_stale() -> bool:
+    return _categories is None or time.monotonic() - _categories[0] > _CATEGORY_TTL
+
+def _set_categories(categories: list[str]) -> list[str]:
+    global _categories
+    _categories = (time.monotonic(), categories)
+    return categories
+
+def available_categories() -> list[str]:
+    """documents 파티션 카테고리 목록 (적재 중 새 파티션이 생길 수 있어 60초 캐시)"""
+    if _categories_stale():
+        with get_pool().connection() as conn:
+            return _set_categories(existing_categories(conn))
+    return _categories[1]
+
+def _as_list(category: str | list[str]) -> list[str]:
+    return [category] if isinstance(category, str) else list(dict.fromkeys(category))
+
+def _knn_branch(category: str, cols: sql.Composable, filters: dict | None, limit: str) -> sql.Composable:
+    """
+    파티션 하나의 근사 최근접 서브쿼리 (cols + 정밀 거리 dist).
+    binary 모드: 양자화 비트 인덱스(해밍 거리)로 limit × RERANK_FACTOR개를 고른 뒤 실제 벡터 거리로 재정렬
+    """
+    exact = sql.SQL("embedding {op} %(emb)s::{vt}").format(op=sql.SQL(operator()), vt=sql.SQL(vector_type()))
+    where = sql.SQL("category = {}").format(sql.Literal(category)) + filter_sql(filters)
+    if not binary_index():
+        return sql.SQL("(SELECT {cols}, {exact} AS dist FROM documents WHERE {where} ORDER BY dist LIMIT {limit})").format(
+            cols=cols, exact=exact, where=where, limit=sql.Placeholder(limit))
+    return sql.SQL("""(SELECT * FROM (
+                          SELECT {cols}, {exact} AS dist FROM documents WHERE {where}
+                          ORDER BY {bq} <~> binary_quantize(%(emb)s::{vt}) LIMIT {limit} * %(rerank)s
+                      ) c ORDER BY dist LIMIT {limit})""").format(
+        cols=cols, exact=exact, where=where, bq=sql.SQL(quantized("embedding")), vt=sql.SQL(vector_type()),
+        limit=sql.Placeholder(limit))
+
+def _knn_union(categories: list[str], cols: sql.Composable, filters: dict | None, limit: str) -> sql.Composable:
+    """
+    파티션마다 ORDER BY 거리 LIMIT 서브쿼리를 만들어 UNION ALL.
+    category = 상수 조건이라 각 서브쿼리는 파티션 하나로 pruning되고 그 파티션의 HNSW 인덱스를 사용
+    """
+    return sql.SQL(" UNION ALL ").join(_knn_branch(c, cols, filters, limit) for c in categories)
+
+def _ef_for(limit: int, ef_search: int | None) -> int:
+    # ef_search는 인덱스에서 꺼낼 후보 수 이상이어야 모두 돌려받을 수 있음
+    candidates = limit * RERANK_FACTOR if binary_index() else limit
+    return max(ef_search or HNSW_EF_SEARCH, candidates)
+
+# ------------------ 검색 결과 캐시 ------------------
+def corpus_generations() -> dict[str, int] | None:
+    """카테고리별 세대 번호 (기본 1초마다 DB에서 다시 읽음). 세대 테이블이 없으면 None"""
+    if retrieval_cache.generations_stale():
+        try:
+            with get_pool().connection() as conn:
+                rows = conn.execute(GENERATION_SQL).fetchall()
+        except psycopg.errors.UndefinedTable:
+            rows = None  # 세대 테이블이 없으면 무효화할 수 없으므로 캐시 사용 안 함
+        retrieval_cache.set_generations(rows)
+    return retrieval_cache.current_generations()
+
+def _cache_key(kind: str, categories: list[str], embedding, k: int, filters, ef_search, text=None):
+    if not RETRIEVAL_CACHE_ENABLED:
+        return None
+    corpus_generations()
+    return retrieval_cache.make_key(kind, categories, embedding, k, filters, ef_search, text)
+
+# ------------------ MMR 다양화 ------------------
+def _use_mmr(mmr: bool | None) -> bool:
+    return MMR_ENABLED if mmr is None else mmr
+
+def _diversify(embedding: list[float], hits: list[dict], k: int) -> list[dict]:
+    """
+    과다 조회한 후보에서 MMR로 k개를 고르고 임베딩/점수는 떼어 냄 (캐시·state·프롬프트에 싣지 않음).
+    하이브리드 결과는 RRF 점수를 관련도로 사용 (어휘 매칭으로 올라온 청크가 코사인 기준으로 밀리지 않도록)
+    """
+    if hits:
+        dim = len(next((h["embedding"] for h in hits if h.get("embedding") is not None), embedding))
+        embeddings = [h["embedding"] if h.get("embedding") is not None else [0.0] * dim for h in hits]
+        relevance = None
+        if "score" in hits[0]:
+            top = max(float(h["score"]) for h in hits) or 1.0
+            relevance = [float(h["score"]) / top for h in hits]
+        hits = [hits[i] for i in mmr_select(embedding, embeddings, k, relevance=relevance)]
+    for h in hits:
+        h.pop("embedding", None)
+        h.pop("score", None)
+    return hits
+
+# ------------------ 벡터 검색 ------------------
+def _vector_query(category: str | list[str], embedding: list[float], k: int, filters: dict | None = None,
+                  with_embedding: bool = False):
+    # 파티션이 여러 개면 파티션별 상위 k개를 모아 전체 거리순으로 다시 k개 (fan-out)
+    inner, outer = _EMB_COLUMNS if with_embedding else (_COLUMNS, _COLUMNS)
+    query = sql.SQL("SELECT {cols} FROM ({union}) u ORDER BY dist LIMIT %(k)s").format(
+        cols=outer, union=_knn_union(_as_list(category), inner, filters, "k"))
+    return query, {"emb": embedding, "k": k, "rerank": RERANK_FACTOR}
+
+_index_checked: set[str] = set()
+
+def _explain_query(category: str):
+    probe = [0.0] * (EMBED_DIM - 1) + [1.0]
+    query, params = _vector_query(category, probe, 8)
+    return sql.SQL("EXPLAIN ") + query, params
+
+def _report_plan(category: str, rows) -> bool:
+    plan = "\n".join(r[0] for r in rows)
+    uses_index = "Index Scan" in plan
+    if not uses_index:
+        print(f"⚠️ {category}: 벡터 검색이 인덱스를 사용하지 않습니다. "
+              f"VECTOR_METRIC({operator()})과 HNSW opclass가 일치하는지 확인하세요.\n{plan}")
+    return uses_index
+
+def check_vector_index(category: str) -> bool:
+    """EXPLAIN으로 검색 쿼리가 HNSW 인덱스를 타는지 확인 (opclass/연산자 불일치 시 순차 스캔)"""
+    with get_pool().connection() as conn:
+        return _report_plan(category, conn.execute(*_explain_query(category)).fetchall())
+
+def _unchecked(categories: list[str], checked: set[str] = _index_checked) -> list[str]:
+    todo = [c for c in categories if VECTOR_INDEX_CHECK and c not in checked]
+    checked.update(todo)
+    return todo
+
+def _check_indexes(categories: list[str]):
+    for c in _unchecked(categories):
+        check_vector_index(c)
+
+_lexical_checked: set[str] = set()
+
+def _explain_lexical(category: str):
+    # 3글자(trigram)와 2글자(tsvector) 용어를 모두 넣어 두 인덱스를 함께 확인
+    query = sql.SQL("EXPLAIN SELECT id FROM documents WHERE category = %(c)s AND ({})").format(
+        _lexical_match(["정제마진", "유가"]))
+    return query, {"c": category}
+
+def _report_lexical_plan(category: str, rows) -> bool:
+    plan = "\n".join(r[0] for r in rows)
+    uses_index = "_content_trgm" in plan and "_content_tsv" in plan
+    if not uses_index:
+        print(f"⚠️ {category}: 하이브리드 검색의 어휘 매칭이 trigram/tsvector 인덱스를 사용하지 않습니다. "
+              f"db/partitions.py의 content 인덱스가 있는지 확인하세요 (python db_init/db_config.py).\n{plan}")
+    return uses_index
+
+def check_lexical_index(category: str) -> bool:
+    """EXPLAIN으로 어휘 매칭이 content 인덱스를 타는지 확인 (작은 파티션의 순차 스캔 선택은 제외)"""
+    with get_pool().connection() as conn:
+        conn.execute("SET LOCAL enable_seqscan = off")
+        return _report_lexical_plan(category, conn.execute(*_explain_lexical(category)).fetchall())
+
+def _check_lexical_indexes(categories: list[str]):
+    for c in _unchecked(categories, _lexical_checked):
+        check_lexical_index(c)
+
+def vector_search(category: str | list[str], embedding: list[float], k: int = 8, ef_search: int | None = None,
+                  filters: dict | None = None, mmr: bool | None = None):
+    """
+    category: 카테고리 하나 또는 여러 개(fan-out).
+    filters: {"years": [2024], "sources": ["naver_research"], "brokers": ["삼성증권"]} (선택)
+    mmr: k × MMR_FETCH_FACTOR개를 가져와 MMR로 k개 선택 (기본 MMR_ENABLED)
+    """
+    categories = _as_list(category)
+    mmr = _use_mmr(mmr)
+    key = _cache_key("vec+mmr" if mmr else "vec", categories, embedding, k, filters, ef_search)
+    hits = retrieval_cache.cache.get(key) if key is not None else None
+    if hits is not None:
+        return hits
+
+    _check_indexes(categories)
+    n = k * MMR_FETCH_FACTOR if mmr else k
+    query, params = _vector_query(categories, embedding, n, filters, with_embedding=mmr)
+    hits = _run_search(query, params, _ef_for(n, ef_search), filtered=has_filters(filters))
+    if mmr:
+        hits = _diversify(embedding, hits, k)
+    if key is not None:
+        retrieval_cache.cache.put(key, hits)
+    return hits
+
+def _search_settings(ef: int, filtered: bool) -> list[tuple[str, tuple]]:
+    # 트랜잭션 범위(SET LOCAL)로만 적용되어 풀의 다른 사용자에게 영향 없음
+    settings = [("SELECT set_config('hnsw.ef_search', %s, true)", (str(ef),))]
+    if filtered and HNSW_ITERATIVE_SCAN != "off":
+        # 필터로 후보가 걸러져 k개보다 적게 나오는 것을 방지 (pgvector 0.8+)
+        settings.append(("SELECT set_config('hnsw.iterative_scan', %s, true)", (HNSW_ITERATIVE_SCAN,)))
+    return settings
+
+def _to_hits(results) -> list[dict]:
+    hits = [{"content": r[0], "page": r[1], "filename": r[2], "chunk_type": r[3], "id": r[4]} for r in results]
+    # MMR 조회면 embedding(real[]), 하이브리드면 RRF score가 뒤에 붙음 (_diversify에서 제거)
+    for h, r in zip(hits, results):
+        if len(r) > 5:
+            h["embedding"] = r[5]
+        if len(r) > 6:
+            h["score"] = r[6]
+    return hits
+
+def _run_search(query, params, ef: int, filtered: bool = False):
+    with get_pool().connection() as conn:
+        # pipeline 모드: set_config와 검색 쿼리를 한 번의 네트워크 왕복으로 전송
+        with conn.pipeline(), conn.cursor() as cur:
+            for stmt, args in _search_settings(ef, filtered):
+                cur.execute(stmt, args)
+            cur.execute(query, params)
             results = cur.fetchall()
-    return [{"content": r[0], "page": r[1], "filename": r[2], "chunk_type": r[3]} for r in results]
+    return _to_hits(results)
+
+# ------------------ 하이브리드 검색 (pg_trgm + 벡터, RRF) ------------------
+_TERM_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9+&.\-]*|[가-힣]+")
+_JOSA = ("은", "는", "이", "가", "을", "를", "의", "에", "로", "과", "와", "도", "만")
+
+def lexical_terms(query: str, limit: int = 8) -> list[str]:
+    """질의에서 정확 매칭에 쓸 용어 추출 (티커, 회사명, 한글 단어; 끝의 조사 1자 제거)"""
+    terms = []
+    for t in _TERM_RE.findall(query or ""):
+        if re.fullmatch(r"[가-힣]+", t) and len(t) > 2 and t.endswith(_JOSA):
+            t = t[:-1]
+        if len(t) >= 2 and t.lower() not in (x.lower() for x in terms):
+            terms.append(t)
+    return terms[:limit]
+
+def _like_pattern(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+# pg_trgm GIN은 3글자 미만 ILIKE 패턴을 인덱스로 처리하지 못해(파티션 전체 스캔) 2글자 용어(정유, 유가, 마진)는
+# 단어 접두 매칭(to_tsvector('simple') GIN, db/partitions.py)으로 찾는다. 조사가 붙은 어절('정유사의')은 잡히고,
+# 복합어 중간('국내정유')은 놓친다. 숫자 2자리('24')는 거의 모든 표에 있어 어휘 매칭에서 제외
+_TRGM_MIN_LEN = 3
+_SHORT_TERM_RE = re.compile(r"[가-힣A-Za-z][가-힣A-Za-z0-9]*")
+
+def _prefix_tsquery(terms: list[str]) -> str:
+    return " | ".join(f"'{t.lower()}':*" for t in terms)
+
+def _lexical_match(terms: list[str]) -> sql.Composable | None:
+    """인덱스로 처리되는 어휘 매칭 조건 (ILIKE는 trigram GIN, 2글자는 tsvector GIN → BitmapOr)"""
+    parts = [sql.SQL("content ILIKE {}").format(sql.Literal(_like_pattern(t)))
+             for t in terms if len(t) >= _TRGM_MIN_LEN]
+    short = [t for t in terms if len(t) < _TRGM_MIN_LEN and _SHORT_TERM_RE.fullmatch(t)]
+    if short:
+        parts.append(sql.SQL("to_tsvector('simple', content) @@ to_tsquery('simple', {})").format(
+            sql.Literal(_prefix_tsquery(short))))
+    return sql.SQL(" OR ").join(parts) if parts else None
+
+def _hybrid_query(category: str | list[str], embedding: list[float], query_text: str, k: int,
+                  filters: dict | None = None, with_embedding: bool = False):
+    """벡터 순위와 어휘 매칭 순위를 Reciprocal Rank Fusion으로 합치는 단일 SQL"""
+    terms = lexical_terms(query_text)
+    matches = _lexical_match(terms)
+    if matches is None:
+        return None
+    # 후보 행은 인덱스로 찾고, 용어별 일치 수(hits)는 찾은 행에서만 계산
+    hits = sql.SQL(" + ").join(
+        sql.SQL("(content ILIKE {})::int").format(sql.Literal(_like_pattern(t))) for t in terms
+    )
+    query = sql.SQL("""
+        WITH vec AS (
+            SELECT id, category, row_number() OVER (ORDER BY dist) AS rnk
+            FROM ({knn}) v
+            ORDER BY dist LIMIT %(n)s
+        ),
+        lex AS (
+            SELECT id, category, row_number() OVER (ORDER BY hits DESC, sim DESC) AS rnk
+            FROM (SELECT id, category, {hits} AS hits, word_similarity(%(q)s, content) AS sim
+                  FROM documents WHERE category = ANY(%(categories)s){where} AND ({matches})
+                  ORDER BY hits DESC, sim DESC LIMIT %(n)s) l
+        ),
+        fused AS (
+            SELECT id, category, sum(1.0 / (%(rrf_k)s + rnk)) AS score
+            FROM (SELECT * FROM vec UNION ALL SELECT * FROM lex) u
+            GROUP BY id, category
+        )
+        SELECT d.content, d.page, d.filename, d.chunk_type, d.id{extra}
+        FROM fused f JOIN documents d ON d.id = f.id AND d.category = f.category
+        ORDER BY f.score DESC LIMIT %(k)s
+    """).format(hits=hits, matches=matches, where=filter_sql(filters),
+                extra=sql.SQL(", d.embedding::real[], f.score" if with_embedding else ""),
+                knn=_knn_union(_as_list(category), sql.SQL("id, category"), filters, "n"))
+    params = {"emb": embedding, "categories": _as_list(category), "q": " ".join(terms),
+              "n": max(HYBRID_CANDIDATES, k), "rrf_k": RRF_K, "k": k, "rerank": RERANK_FACTOR}
+    return query, params
+
+def hybrid_search(category: str | list[str], embedding: list[float], query_text: str, k: int = 8,
+                  ef_search: int | None = None, filters: dict | None = None, mmr: bool | None = None):
+    """어휘(pg_trgm) + 벡터 하이브리드 검색. 추출할 용어가 없으면 벡터 검색으로 대체"""
+    mmr = _use_mmr(mmr)
+    built = _hybrid_query(category, embedding, query_text, k * MMR_FETCH_FACTOR if mmr else k, filters,
+                          with_embedding=mmr)
+    if built is None:
+        return vector_search(category, embedding, k=k, ef_search=ef_search, filters=filters, mmr=mmr)
+    categories = _as_list(category)
+    query, params = built
+    key = _cache_key("hybrid+mmr" if mmr else "hybrid", categories, embedding, k, filters, ef_search, params["q"])
+    hits = retrieval_cache.cache.get(key) if key is not None else None
+    if hits is not None:
+        return hits
+
+    _check_indexes(categories)
+    _check_lexical_indexes(categories)
+    hits = _run_search(query, params, _ef_for(params["n"], ef_search), filtered=has_filters(filters))
+    if mmr:
+        hits = _diversify(embedding, hits, k)
+    if key is not None:
+        retrieval_cache.cache.put(key, hits)
+    return hits
+
+# (doc_id, page) 키를 배열 두 개로 받아 unnest로 조인하는 단일 쿼리 (prepared, idx_structured_tables_doc_page 사용).
+# 호출마다 임시 테이블을 만들고 지우면 pg_class/pg_attribute에 dead tuple이 쌓인다.
+_STRUCTURED_SQL = """SELECT st.doc_id, st.page, st.caption, st.domain, st.table_json, st.id
+                     FROM unnest(%s::text[], %s::int[]) AS k(doc_id, page)
+                     JOIN structured_tables st ON st.doc_id = k.doc_id AND st.page = k.page
+                     ORDER BY st.id"""
+
+def _key_arrays(keys) -> tuple[list[str], list[int]]:
+    ordered = sorted(set(keys))
+    return [k[0] for k in ordered], [k[1] for k in ordered]
+
+def _group_tables(tables: list[dict], key_sets: list[set[tuple[str, int]]]) -> list[list[dict]]:
+    by_key: dict[tuple[str, int], list[dict]] = {}
+    for t in tables:
+        by_key.setdefault((t["doc_id"], t["page"]), []).append(t)
+    return [[t for key in sorted(keys) for t in by_key.get(key, [])] for keys in key_sets]
+
+def _to_tables(results) -> list[dict]:
+    return [{"doc_id": r[0], "page": r[1], "caption": r[2], "domain": r[3], "table_json": r[4], "id": r[5]}
+            for r in results]
 
 def load_structured_by_keys(keys: set[tuple[str, int]]):
     if not keys:
         return []
-    
-    with psycopg.connect(DB_URL) as conn:
-        with conn.cursor() as cur:
-            # Create a temporary table to hold the keys
-            cur.execute("CREATE TEMPORARY TABLE temp_keys (doc_id TEXT, page INT)")
-            
-            # Insert the keys into the temporary table
-            with cur.copy("COPY temp_keys (doc_id, page) FROM STDIN") as copy:
-                for doc_id, page in keys:
-                    copy.write_row((doc_id, page))
-            
-            # Select from structured_tables where (doc_id, page) is in temp_keys
-            cur.execute(
-                """SELECT st.doc_id, st.page, st.caption, st.domain, st.table_json
-                   FROM structured_tables st
-                   JOIN temp_keys tk ON st.doc_id = tk.doc_id AND st.page = tk.page"""
-            )
-            results = cur.fetchall()
-            
-            # Drop the temporary table
-            cur.execute("DROP TABLE temp_keys")
-            
-    return [{"doc_id": r[0], "page": r[1], "caption": r[2], "domain": r[3], "table_json": r[4]} for r in results]
+    with get_pool().connection() as conn:
+        results = conn.execute(_STRUCTURED_SQL, _key_arrays(keys), prepare=True).fetchall()
+    return _to_tables(results)
+
+def load_structured_bulk(key_sets: list[set[tuple[str, int]]]) -> list[list[dict]]:
+    """여러 질의의 키 집합을 한 번의 쿼리로 조회해 질의별로 나눠 반환 (겹치는 키는 한 번만 읽음)"""
+    keys = set().union(*key_sets) if key_sets else set()
+    return _group_tables(load_structured_by_keys(keys), key_sets)
+
+# ------------------ async 변형 (동기 버전과 같은 SQL 빌더 사용) ------------------
+# 이벤트 루프 하나에서 여러 질문을 동시에 처리할 때 DB 대기 동안 스레드를 점유하지 않는다.
+
+async def aknown_brokers() -> list[str]:
+    if _brokers_stale():
+        pool = await get_async_pool()
+        async with pool.connection() as conn:
+            cur = await conn.execute(_BROKERS_SQL)
+            return _set_brokers(await cur.fetchall())
+    return _brokers[1]
+
+async def aavailable_categories() -> list[str]:
+    if _categories_stale():
+        pool = await get_async_pool()
+        async with pool.connection() as conn:
+            cur = await conn.execute(EXISTING_CATEGORIES_SQL)
+            return _set_categories(sorted(r[0] for r in await cur.fetchall() if r[0]))
+    return _categories[1]
+
+async def _acache_key(kind: str, categories: list[str], embedding, k: int, filters, ef_search, text=None):
+    if not RETRIEVAL_CACHE_ENABLED:
+        return None
+    if retrieval_cache.generations_stale():
+        try:
+            pool = await get_async_pool()
+            async with pool.connection() as conn:
+                cur = await conn.execute(GENERATION_SQL)
+                rows = await cur.fetchall()
+        except psycopg.errors.UndefinedTable:
+            rows = None
+        retrieval_cache.set_generations(rows)
+    return retrieval_cache.make_key(kind, categories, embedding, k, filters, ef_search, text)
+
+async def _acheck_indexes(categories: list[str]):
+    for c in _unchecked(categories):
+        pool = await get_async_pool()
+        async with pool.connection() as conn:
+            cur = await conn.execute(*_explain_query(c))
+            _report_plan(c, await cur.fetchall())
+
+async def _acheck_lexical_indexes(categories: list[str]):
+    for c in _unchecked(categories, _lexical_checked):
+        pool = await get_async_pool()
+        async with pool.connection() as conn:
+            await conn.execute("SET LOCAL enable_seqscan = off")
+            cur = await conn.execute(*_explain_lexical(c))
+            _report_lexical_plan(c, await cur.fetchall())
+
+async def _arun_search(query, params, ef: int, filtered: bool = False):
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        async with conn.pipeline(), conn.cursor() as cur:
+            for stmt, args in _search_settings(ef, filtered):
+                await cur.execute(stmt, args)
+            await cur.execute(query, params)
+            results = await cur.fetchall()
+    return _to_hits(results)
+
+async def avector_search(category: str | list[str], embedding: list[float], k: int = 8,
+                         ef_search: int | None = None, filters: dict | None = None, mmr: bool | None = None):
+    """vector_search의 async 버전"""
+    categories = _as_list(category)
+    mmr = _use_mmr(mmr)
+    key = await _acache_key("vec+mmr" if mmr else "vec", categories, embedding, k, filters, ef_search)
+    hits = retrieval_cache.cache.get(key) if key is not None else None
+    if hits is not None:
+        return hits
+
+    await _acheck_indexes(categories)
+    n = k * MMR_FETCH_FACTOR if mmr else k
+    query, params = _vector_query(categories, embedding, n, filters, with_embedding=mmr)
+    hits = await _arun_search(query, params, _ef_for(n, ef_search), filtered=has_filters(filters))
+    if mmr:
+        hits = _diversify(embedding, hits, k)
+    if key is not None:
+        retrieval_cache.cache.put(key, hits)
+    return hits
+
+async def ahybrid_search(category: str | list[str], embedding: list[float], query_text: str, k: int = 8,
+                         ef_search: int | None = None, filters: dict | None = None, mmr: bool | None = None):
+    """hybrid_search의 async 버전"""
+    mmr = _use_mmr(mmr)
+    built = _hybrid_query(category, embedding, query_text, k * MMR_FETCH_FACTOR if mmr else k, filters,
+                          with_embedding=mmr)
+    if built is None:
+        return await avector_search(category, embedding, k=k, ef_search=ef_search, filters=filters, mmr=mmr)
+    categories = _as_list(category)
+    query, params = built
+    key = await _acache_key("hybrid+mmr" if mmr else "hybrid", categories, embedding, k, filters, ef_search,
+                            params["q"])
+    hits = retrieval_cache.cache.get(key) if key is not None else None
+    if hits is not None:
+        return hits
+
+    await _acheck_indexes(categories)
+    await _acheck_lexical_indexes(categories)
+    hits = await _arun_search(query, params, _ef_for(params["n"], ef_search), filtered=has_filters(filters))
+    if mmr:
+        hits = _diversify(embedding, hits, k)
+    if key is not None:
+        retrieval_cache.cache.put(key, hits)
+    return hits
+
+async def aload_structured_by_keys(keys: set[tuple[str, int]]):
+    """load_structured_by_keys의 async 버전"""
+    if not keys:
+        return []
+    pool = await get_async_pool()
+    async with pool.connection() as conn:
+        cur = await conn.execute(_STRUCTURED_SQL, _key_arrays(keys), prepare=True)
+        results = await cur.fetchall()
+    return _to_tables(results)
+
+async def aload_structured_bulk(key_sets: list[set[tuple[str, int]]]) -> list[list[dict]]:
+    """load_structured_bulk의 async 버전"""
+    keys = set().union(*key_sets) if key_sets else set()
+    return _group_tables(await aload_structured_by_keys(keys), key_sets)
@@ -0,0 +1,23 @@
+import psycopg
+
+# 파티션(category)별 세대 번호. 적재/삭제가 커밋될 때마다 1씩 올라가며,
+# 검색 결과 캐시는 세대 번호를 키에 포함해 새 리포트가 들어오면 자동으로 무효화된다.
+GENERATION_SQL = "SELECT category, generation FROM corpus_generation"
+
+def ensure_generation_table(conn: psycopg.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS corpus_generation (
+            category text PRIMARY KEY,
+            generation bigint NOT NULL DEFAULT 0,
+            updated_at timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+
+def bump_generation(cur, category: str):
+    """적재 트랜잭션 안에서 호출 (커밋과 동시에 캐시 무효화). 행 잠금은 커밋 직전에만 잡히도록 마지막에 호출"""
+    cur.execute(
+        """INSERT INTO corpus_generation (category, generation) VALUES (%s, 1)
+           ON CONFLICT (category) DO UPDATE
+           SET generation = corpus_generation.generation + 1, updated_at = now()""",
+        (category,),
+    )
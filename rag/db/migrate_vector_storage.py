@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+embedding 저장 형식 전환 (vector ↔ halfvec, full ↔ binary 인덱스) + recall/메모리 벤치마크
+- 모든 파티션의 HNSW 인덱스를 내리고 컬럼 타입을 바꾼 뒤 새 설정으로 인덱스 재생성
+- --benchmark: 변환 전에 정답(정밀 거리 top-k)을 만들어 두고, 변환 전/후의
+  테이블·인덱스 크기, recall@k, 검색 지연(p50/p95)을 같은 질의로 비교
+
+사용 예:
+    python db/migrate_vector_storage.py --to halfvec --index binary --benchmark
+앱/적재 프로세스도 같은 값으로 실행해야 함: VECTOR_STORAGE=halfvec VECTOR_INDEX_MODE=binary
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="embedding 저장 형식 전환 + recall/메모리 벤치마크")
+    parser.add_argument("--to", choices=["vector", "halfvec"], default=os.getenv("VECTOR_STORAGE", "halfvec"))
+    parser.add_argument("--index", choices=["full", "binary"], default=os.getenv("VECTOR_INDEX_MODE", "full"))
+    parser.add_argument("--category", action="append", help="벤치마크할 카테고리 (기본: 전체 파티션)")
+    parser.add_argument("--benchmark", action="store_true", help="변환 전/후 recall@k, 지연, 크기 비교")
+    parser.add_argument("--benchmark-only", action="store_true", help="변환 없이 현재 상태만 측정")
+    parser.add_argument("--queries", type=int, default=50, help="벤치마크 질의 수 (저장된 청크 임베딩을 질의로 사용)")
+    parser.add_argument("-k", type=int, default=8)
+    return parser.parse_args()
+
+# settings / vector_ops가 import 시점에 값을 읽으므로 rag 모듈 import 전에 환경 구성
+args = _parse_args() if __name__ == "__main__" else None
+if args:
+    os.environ["VECTOR_STORAGE"] = args.to
+    os.environ["VECTOR_INDEX_MODE"] = args.index
+
+import psycopg
+from psycopg import sql
+from core.settings import DB_URL, EMBED_DIM, HNSW_EF_SEARCH, RERANK_FACTOR
+from db.partitions import existing_categories, partition_for
+from db.vector_ops import operator, quantized
+from ingest.bulk_load import drop_partition_index, rebuild_partition_index
+
+# ------------------ 현재 상태 ------------------
+def column_type(conn: psycopg.Connection) -> str:
+    return conn.execute(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = 'documents'::regclass AND attname = 'embedding'"
+    ).fetchone()[0]
+
+def storage_report(conn: psycopg.Connection, partitions: list[str]) -> dict:
+    """파티션별 테이블(TOAST 포함)/HNSW 인덱스 크기 (bytes)"""
+    report = {}
+    for p in partitions:
+        table_bytes = conn.execute("SELECT pg_table_size(%s::regclass)", (p,)).fetchone()[0]
+        indexes = conn.execute(
+            """SELECT indexname, pg_relation_size(format('%%I', indexname)::regclass)
+               FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s
+                 AND indexdef ILIKE '%%USING hnsw%%'""",
+            (p,),
+        ).fetchall()
+        report[p] = {"table": table_bytes, "hnsw": sum(b for _, b in indexes), "indexes": [n for n, _ in indexes]}
+    return report
+
+def _mb(b: int) -> str:
+    return f"{b / 1024 / 1024:,.1f} MB"
+
+# ------------------ recall 벤치마크 ------------------
+def sample_queries(conn: psycopg.Connection, category: str, n: int) -> list[list[float]]:
+    rows = conn.execute(
+        """SELECT embedding::real[] FROM documents TABLESAMPLE SYSTEM (5)
+           WHERE category = %s AND embedding IS NOT NULL LIMIT %s""",
+        (category, n),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+def exact_topk(conn: psycopg.Connection, category: str, queries: list[list[float]], k: int, vtype: str) -> list[list[int]]:
+    """인덱스를 끈 순차 스캔으로 정밀 top-k (정답)"""
+    query = sql.SQL("""SELECT id FROM documents WHERE category = %s
+                       ORDER BY embedding {op} %s::{vt} LIMIT %s""").format(op=sql.SQL(operator()), vt=sql.SQL(vtype))
+    truth = []
+    with conn.transaction():
+        conn.execute("SET LOCAL enable_indexscan = off")
+        for q in queries:
+            truth.append([r[0] for r in conn.execute(query, (category, q, k)).fetchall()])
+    return truth
+
+def approx_topk(conn: psycopg.Connection, category: str, queries: list[list[float]], k: int,
+                vtype: str, binary: bool) -> tuple[list[list[int]], list[float]]:
+    if binary:
+        query = sql.SQL("""SELECT id FROM (
+                               SELECT id, embedding {op} %(q)s::{vt} AS dist FROM documents WHERE category = %(c)s
+                               ORDER BY {bq} <~> binary_quantize(%(q)s::{vt}) LIMIT %(n)s
+                           ) c ORDER BY dist LIMIT %(k)s""").format(
+            op=sql.SQL(operator()), vt=sql.SQL(vtype), bq=sql.SQL(quantized("embedding", EMBED_DIM)))
+    else:
+        query = sql.SQL("""SELECT id FROM documents WHERE category = %(c)s
+                           ORDER BY embedding {op} %(q)s::{vt} LIMIT %(k)s""").format(
+            op=sql.SQL(operator()), vt=sql.SQL(vtype))
+    n = k * RERANK_FACTOR if binary else k
+    results, latencies = [], []
+    with conn.transaction():
+        conn.execute("SELECT set_config('hnsw.ef_search', %s, true)", (str(max(HNSW_EF_SEARCH, n)),))
+        for q in queries:
+            t0 = time.perf_counter()
+            rows = conn.execute(query, {"c": category, "q": q, "k": k, "n": n}).fetchall()
+            latencies.append((time.perf_counter() - t0) * 1000)
+            results.append([r[0] for r in rows])
+    return results, latencies
+
+def recall(truth: list[list[int]], found: list[list[int]]) -> float:
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    total = sum(len(t) for t in truth)
+    return hits / total if total else 0.0
+
+def _pct(values: list[float], p: float) -> float:
+    s = sorted(values)
+    return s[min(len(s) - 1, int(len(s) * p))] if s else 0.0
+
+def measure(conn: psycopg.Connection, label: str, category: str, queries, truth, k: int):
+    vtype = column_type(conn).split("(")[0]
+    binary = any("bit_hamming_ops" in d for _, d in conn.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s", (partition_for(conn, category),)
+    ).fetchall())
+    found, lat = approx_topk(conn, category, queries, k, vtype, binary)
+    print(f"   [{label}] {category}: {vtype}{' + binary' if binary else ''}  recall@{k}={recall(truth, found):.3f}  "
+          f"p50={_pct(lat, 0.5):.1f}ms p95={_pct(lat, 0.95):.1f}ms")
+
+def print_storage(label: str, report: dict, shared_buffers: str):
+    print(f"📦 [{label}] shared_buffers={shared_buffers}")
+    for p, r in report.items():
+        print(f"   {p}: table {_mb(r['table'])} / hnsw {_mb(r['hnsw'])} {r['indexes']}")
+    total = sum(r["table"] + r["hnsw"] for r in report.values())
+    print(f"   합계 {_mb(total)}")
+
+# ------------------ 변환 ------------------
+def migrate(conn: psycopg.Connection, to: str, partitions: list[str]):
+    """HNSW 인덱스 삭제 → 컬럼 타입 변경(전 파티션 재작성) → 새 설정으로 인덱스 재생성"""
+    deferred = {p: drop_partition_index(conn, p) for p in partitions}
+    current = column_type(conn)
+    target = f"{to}({EMBED_DIM})"
+    try:
+        if current != target:
+            print(f"🔁 documents.embedding: {current} → {target} (모든 파티션 재작성)")
+            t0 = time.monotonic()
+            conn.execute(sql.SQL("ALTER TABLE documents ALTER COLUMN embedding TYPE {t} USING embedding::{t}").format(
+                t=sql.SQL(target)))
+            print(f"✅ 컬럼 변환 완료 ({time.monotonic() - t0:.1f}s)")
+        else:
+            print(f"ℹ️ documents.embedding 이미 {target}: 인덱스만 재생성")
+    finally:
+        # 변환이 실패해도 검색이 가능하도록 인덱스는 반드시 재생성
+        for p, defs in deferred.items():
+            rebuild_partition_index(p, defs)
+
+def main():
+    with psycopg.connect(DB_URL, autocommit=True) as conn:
+        categories = args.category or existing_categories(conn)
+        partitions = [p for p in (partition_for(conn, c) for c in categories) if p]
+        shared_buffers = conn.execute("SHOW shared_buffers").fetchone()[0]
+        bench = args.benchmark or args.benchmark_only
+
+        samples = {}
+        if bench:
+            # 변환 전 정밀 거리 기준 정답을 고정해 두고 같은 질의로 전/후 비교
+            vtype = column_type(conn).split("(")[0]
+            print(f"🎯 정답(top-{args.k}) 계산: {vtype} 정밀 거리, 카테고리당 질의 {args.queries}개")
+            for c in categories:
+                queries = sample_queries(conn, c, args.queries)
+                if queries:
+                    samples[c] = (queries, exact_topk(conn, c, queries, args.k, vtype))
+            print_storage("변환 전", storage_report(conn, partitions), shared_buffers)
+            for c, (queries, truth) in samples.items():
+                measure(conn, "변환 전", c, queries, truth, args.k)
+
+        if args.benchmark_only:
+            return
+
+        migrate(conn, args.to, partitions)
+
+        if bench:
+            print_storage("변환 후", storage_report(conn, partitions), shared_buffers)
+            for c, (queries, truth) in samples.items():
+                measure(conn, "변환 후", c, queries, truth, args.k)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import numpy as np
+from core.settings import MMR_LAMBDA
+
+# Maximal Marginal Relevance: 관련도는 높고 이미 고른 청크와는 덜 비슷한 청크를 차례로 선택.
+# 후보 간 유사도 행렬을 한 번에 계산하고, 반복마다 "이미 고른 것과의 최대 유사도"만 벡터 연산으로 갱신한다.
+
+def _unit(x: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.where(norm == 0, 1.0, norm)
+
+def mmr_select(query_embedding, embeddings, k: int, lambda_: float = MMR_LAMBDA, relevance=None) -> list[int]:
+    """
+    embeddings: 후보 임베딩 (n × dim). relevance를 주지 않으면 질의와의 코사인 유사도를 관련도로 사용.
+    반환: 고른 후보의 인덱스 (선택 순서 = 프롬프트에 넣을 순서)
+    """
+    emb = _unit(np.asarray(embeddings, dtype=np.float32))
+    n = len(emb)
+    if n <= k:
+        return list(range(n))
+    if relevance is None:
+        rel = emb @ _unit(np.asarray(query_embedding, dtype=np.float32))
+    else:
+        rel = np.asarray(relevance, dtype=np.float32)
+    sim = emb @ emb.T
+
+    selected: list[int] = []
+    redundancy = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    for _ in range(k):
+        scores = np.where(available, lambda_ * rel - (1 - lambda_) * redundancy, -np.inf)
+        i = int(np.argmax(scores))
+        selected.append(i)
+        available[i] = False
+        np.maximum(redundancy, sim[i], out=redundancy)
+    return selected
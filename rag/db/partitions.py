@@ -0,0 +1,87 @@
+import re
+import threading
+import psycopg
+from psycopg import sql
+from core.settings import HNSW_M, HNSW_EF_CONSTRUCTION
+from db.generation import ensure_generation_table
+from db.vector_ops import binary_index, index_target
+
+# documents는 category 기준 LIST 파티션. 출처마다 별도 파티션 + 별도 HNSW 그래프를 둔다.
+# 카테고리 → 파티션 테이블 이름 (NAVER는 db_config.py가 만든 기존 파티션)
+CATEGORIES = {
+    "NAVER": "naver",              # 네이버 증권사 리포트
+    "PETRONET": "petronet",        # 페트로넷 석유 정보
+    "RENEWABLE": "renewable",      # 재생에너지 리포트
+    "ENERGY_STAT": "energy_stat",  # 에너지 통계
+}
+
+_CATEGORY_RE = re.compile(r"^[A-Z][A-Z0-9_]*$")
+
+def partition_name(category: str) -> str:
+    if not _CATEGORY_RE.match(category):
+        raise ValueError(f"잘못된 카테고리 이름: {category!r}")
+    return CATEGORIES.get(category, category.lower())
+
+def partition_for(conn: psycopg.Connection, category: str) -> str | None:
+    """documents의 LIST 파티션 중 category 값을 담는 파티션 테이블 이름"""
+    row = conn.execute(
+        """SELECT c.relname
+           FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+           WHERE i.inhparent = 'documents'::regclass
+             AND pg_get_expr(c.relpartbound, c.oid) = format('FOR VALUES IN (%%L)', %s::text)""",
+        (category,),
+    ).fetchone()
+    return row[0] if row else None
+
+# async 경로(db/deps.py)와 공유
+EXISTING_CATEGORIES_SQL = """SELECT substring(pg_get_expr(c.relpartbound, c.oid) FROM $$IN \\('([^']+)'\\)$$)
+                             FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                             WHERE i.inhparent = 'documents'::regclass"""
+
+def existing_categories(conn: psycopg.Connection) -> list[str]:
+    """현재 존재하는 파티션의 category 값 목록"""
+    return sorted(r[0] for r in conn.execute(EXISTING_CATEGORIES_SQL).fetchall() if r[0])
+
+def default_index_ddl(partition: str) -> str:
+    suffix = "_bq" if binary_index() else ""
+    return (f"CREATE INDEX IF NOT EXISTS idx_{partition}_embedding{suffix} ON {partition} "
+            f"USING hnsw ({index_target()}) WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION})")
+
+def _secondary_index_ddl(partition: str) -> list[str]:
+    # db_config.py의 NAVER 파티션과 같은 구성 (하이브리드 검색 trigram + 메타데이터 필터)
+    return [
+        f"CREATE INDEX IF NOT EXISTS idx_{partition}_content_trgm ON {partition} USING gin (content gin_trgm_ops)",
+        # 2글자 용어의 단어 접두 매칭 (trigram은 3글자 이상만 인덱스 사용, db/deps.py _lexical_match)
+        f"CREATE INDEX IF NOT EXISTS idx_{partition}_content_tsv ON {partition} "
+        f"USING gin (to_tsvector('simple', content))",
+        f"CREATE INDEX IF NOT EXISTS idx_{partition}_report_date ON {partition} (report_date)",
+        f"CREATE INDEX IF NOT EXISTS idx_{partition}_source_date ON {partition} (source, report_date)",
+        f"CREATE INDEX IF NOT EXISTS idx_{partition}_broker ON {partition} (broker)",
+    ]
+
+_ensured: dict[str, str] = {}
+_lock = threading.Lock()
+
+def ensure_partition(conn: psycopg.Connection, category: str) -> str:
+    """
+    category 파티션이 없으면 인덱스와 함께 생성하고 파티션 이름을 반환 (프로세스당 1회 확인).
+    빈 테이블에 인덱스를 만드는 것이라 비용은 거의 없고, 이후 적재는 행 단위로 그래프에 삽입된다.
+    """
+    if category in _ensured:
+        return _ensured[category]
+    partition = partition_name(category)
+    with _lock, conn.transaction():
+        # 여러 적재 프로세스가 동시에 같은 파티션을 만들지 않도록 직렬화
+        conn.execute("SELECT pg_advisory_xact_lock(hashtext('documents_partition:' || %s))", (category,))
+        ensure_generation_table(conn)
+        existing = partition_for(conn, category)
+        if existing is None:
+            print(f"🧩 파티션 생성: {partition} (category={category})")
+            conn.execute(sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF documents FOR VALUES IN ({})").format(
+                sql.Identifier(partition), sql.Literal(category)))
+            for stmt in [default_index_ddl(partition), *_secondary_index_ddl(partition)]:
+                conn.execute(stmt)
+        else:
+            partition = existing
+    _ensured[category] = partition
+    return partition
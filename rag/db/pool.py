@@ -0,0 +1,80 @@
+import os
+import atexit
+import asyncio
+import threading
+from psycopg_pool import ConnectionPool, AsyncConnectionPool
+from core.settings import (
+    DB_URL, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT, DB_STATEMENT_TIMEOUT_MS,
+)
+
+# 프로세스 단위 연결 풀. 호출마다 connect 하는 대신 미리 열린 백엔드를 재사용한다.
+_POOL_KWARGS = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+
+_pool: ConnectionPool | None = None
+_pool_pid: int | None = None
+_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """현재 프로세스의 연결 풀 (fork된 자식 프로세스는 자체 풀을 새로 생성)"""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(
+                DB_URL,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+                timeout=DB_POOL_TIMEOUT,
+                kwargs=_POOL_KWARGS,
+                check=ConnectionPool.check_connection,  # 꺼내기 전에 끊긴 연결 확인
+                name="rag",
+                open=True,
+            )
+            _pool_pid = os.getpid()
+    return _pool
+
+def close_pool():
+    global _pool
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.close()
+    _pool = None
+
+atexit.register(close_pool)
+
+# ------------------ async 풀 ------------------
+# AsyncConnectionPool은 생성된 이벤트 루프에 묶이므로 (pid, 루프)마다 하나씩 둔다.
+# 서버처럼 루프 하나가 오래 사는 환경에서는 프로세스당 풀 하나와 같다.
+_async_pools: dict[tuple[int, int], asyncio.Task] = {}
+
+async def _open_async_pool() -> AsyncConnectionPool:
+    pool = AsyncConnectionPool(
+        DB_URL,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        timeout=DB_POOL_TIMEOUT,
+        kwargs=_POOL_KWARGS,
+        check=AsyncConnectionPool.check_connection,
+        name="rag-async",
+        open=False,
+    )
+    await pool.open()
+    return pool
+
+async def get_async_pool() -> AsyncConnectionPool:
+    """현재 이벤트 루프의 async 연결 풀 (루프별 첫 호출 시 생성 + open 1회)"""
+    key = (os.getpid(), id(asyncio.get_running_loop()))
+    task = _async_pools.get(key)
+    if task is None:
+        # 동시에 처음 호출된 코루틴도 같은 open 작업을 기다림 (이후 호출은 완료된 작업 결과만 반환)
+        task = _async_pools[key] = asyncio.ensure_future(_open_async_pool())
+    try:
+        return await task
+    except Exception:
+        _async_pools.pop(key, None)
+        raise
+
+async def close_async_pool():
+    task = _async_pools.pop((os.getpid(), id(asyncio.get_running_loop())), None)
+    if task is not None:
+        await (await task).close()
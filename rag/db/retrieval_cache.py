@@ -0,0 +1,88 @@
+import time
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from core.settings import (
+    RETRIEVAL_CACHE_ENABLED, RETRIEVAL_CACHE_TTL, RETRIEVAL_CACHE_MAX_ENTRIES, CORPUS_GENERATION_CHECK_SECONDS,
+)
+
+# 검색 결과 캐시 (프로세스 메모리, TTL + LRU).
+# 키에 관련 파티션들의 세대 번호(corpus_generation)를 넣어, 적재로 세대가 바뀌면 이전 항목은 더 이상 맞지 않고
+# LRU/TTL로 자연히 밀려난다. 세대 번호는 CORPUS_GENERATION_CHECK_SECONDS마다 한 번만 DB에서 다시 읽는다.
+
+class RetrievalCache:
+    def __init__(self, max_entries: int = RETRIEVAL_CACHE_MAX_ENTRIES, ttl: float = RETRIEVAL_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or now - item[0] > self.ttl:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        # 호출 측에서 결과 dict를 수정해도 캐시가 오염되지 않도록 얕은 복사
+        return [dict(h) for h in item[1]]
+
+    def put(self, key, value: list[dict]):
+        with self._lock:
+            self._data[key] = (time.monotonic(), [dict(h) for h in value])
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0}
+
+cache = RetrievalCache()
+
+# ------------------ 세대 번호 스냅샷 ------------------
+_generations: tuple[float, dict[str, int] | None] | None = None
+
+def generations_stale() -> bool:
+    return _generations is None or time.monotonic() - _generations[0] > CORPUS_GENERATION_CHECK_SECONDS
+
+def set_generations(rows) -> None:
+    """rows: (category, generation) 목록. None이면 세대 테이블이 없는 것 → 캐시 사용 안 함"""
+    global _generations
+    _generations = (time.monotonic(), None if rows is None else {c: g for c, g in rows})
+
+def current_generations() -> dict[str, int] | None:
+    return _generations[1] if _generations else None
+
+def _generation_of(categories: list[str]) -> tuple | None:
+    gens = _generations[1] if _generations else None
+    if gens is None:
+        return None
+    return tuple(gens.get(c, 0) for c in categories)
+
+def _embedding_hash(embedding) -> bytes:
+    return hashlib.blake2b(array("f", embedding).tobytes(), digest_size=16).digest()
+
+def _freeze(filters: dict | None) -> tuple:
+    return tuple(sorted((k, tuple(sorted(v))) for k, v in (filters or {}).items() if v))
+
+def make_key(kind: str, categories: list[str], embedding, k: int, filters: dict | None,
+             ef_search: int | None, query_text: str | None = None):
+    """캐시 키. 캐시를 쓸 수 없으면(비활성/세대 테이블 없음) None"""
+    if not RETRIEVAL_CACHE_ENABLED:
+        return None
+    gens = _generation_of(categories)
+    if gens is None:
+        return None
+    return (kind, tuple(categories), gens, _embedding_hash(embedding), k, _freeze(filters), ef_search, query_text)
@@ -0,0 +1,40 @@
+from core.settings import VECTOR_METRIC, VECTOR_STORAGE, VECTOR_INDEX_MODE, EMBED_DIM
+
+# 거리 함수 하나로 HNSW 인덱스 opclass와 ORDER BY 연산자를 함께 결정해야 인덱스가 쓰인다
+_OPERATOR = {"cosine": "<=>", "l2": "<->", "ip": "<#>"}
+_STORAGE = ("vector", "halfvec")
+_INDEX_MODES = ("full", "binary")
+
+if VECTOR_METRIC not in _OPERATOR:
+    raise ValueError(f"❌ 지원하지 않는 VECTOR_METRIC: {VECTOR_METRIC} (cosine | l2 | ip)")
+if VECTOR_STORAGE not in _STORAGE:
+    raise ValueError(f"❌ 지원하지 않는 VECTOR_STORAGE: {VECTOR_STORAGE} (vector | halfvec)")
+if VECTOR_INDEX_MODE not in _INDEX_MODES:
+    raise ValueError(f"❌ 지원하지 않는 VECTOR_INDEX_MODE: {VECTOR_INDEX_MODE} (full | binary)")
+
+def vector_type(storage: str = VECTOR_STORAGE) -> str:
+    """embedding 컬럼 타입 이름 (vector | halfvec). 쿼리 캐스트에도 같은 타입을 써야 인덱스가 쓰인다"""
+    return storage
+
+def opclass(metric: str = VECTOR_METRIC, storage: str = VECTOR_STORAGE) -> str:
+    return f"{storage}_{metric}_ops"
+
+def operator(metric: str = VECTOR_METRIC) -> str:
+    return _OPERATOR[metric]
+
+def binary_index() -> bool:
+    return VECTOR_INDEX_MODE == "binary"
+
+def quantized(expr: str, dim: int = EMBED_DIM) -> str:
+    """binary 인덱스의 식. 인덱스 정의와 ORDER BY 식이 글자 그대로 같아야 인덱스가 쓰인다"""
+    return f"binary_quantize({expr})::bit({dim})"
+
+def index_opclass() -> str:
+    """현재 설정에서 파티션 HNSW 인덱스가 가져야 할 opclass"""
+    return "bit_hamming_ops" if binary_index() else opclass()
+
+def index_target() -> str:
+    """CREATE INDEX ... USING hnsw (<여기>)"""
+    if binary_index():
+        return f"({quantized('embedding')}) bit_hamming_ops"
+    return f"embedding {opclass()}"
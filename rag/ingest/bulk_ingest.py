@@ -1,30 +1,169 @@
-
 import os
 import sys
+import time
+import signal
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tqdm import tqdm
 
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import psycopg
+from core.settings import DB_URL
+from db.pool import get_pool
 from ingest.etl import ingest_pdf
-from nodes.router import pick_category
+from ingest.manifest import ensure_manifest_table, plan_ingest, prune_deleted
+from ingest.pipeline import IngestPipeline
+from ingest.bulk_load import drop_partition_index, rebuild_partition_index
+from db.partitions import CATEGORIES, ensure_partition
 
 NAVER_DB_DIR = "/app/naverDB"
 
-def bulk_ingest_main():
-    pdf_files = [f for f in os.listdir(NAVER_DB_DIR) if f.endswith(".pdf")]
-    
-    # 100개만 처리
-    print(f"Processing {len(pdf_files)} PDF files...")
-    
-    for filename in tqdm(pdf_files, desc="Ingesting PDFs"):
-        filepath = os.path.join(NAVER_DB_DIR, filename)
-        category = pick_category(filename)
+# ------------------ 진행률 리포터 ------------------
+class IngestProgress:
+    """성공/실패 건수와 처리 속도, 남은 시간(ETA)을 한 곳에서 집계"""
+
+    def __init__(self, total: int, desc: str = "Ingesting PDFs"):
+        self.total = total
+        self.ok = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self.bar = tqdm(total=total, desc=desc, unit="pdf")
+
+    def update(self, filename: str, error: str | None = None):
+        if error is None:
+            self.ok += 1
+        else:
+            self.failed += 1
+            tqdm.write(f"Error ingesting {filename}: {error}")
+        eta = self.eta_seconds()
+        self.bar.set_postfix(ok=self.ok, fail=self.failed,
+                             eta=tqdm.format_interval(eta) if eta is not None else "?")
+        self.bar.update(1)
+
+    def eta_seconds(self) -> float | None:
+        done = self.ok + self.failed
+        if done == 0:
+            return None
+        elapsed = time.monotonic() - self.started
+        return elapsed / done * (self.total - done)
+
+    def close(self, cancelled: bool = False):
+        self.bar.close()
+        elapsed = time.monotonic() - self.started
+        rate = (self.ok + self.failed) / elapsed if elapsed > 0 else 0.0
+        status = "cancelled" if cancelled else "done"
+        print(f"[{status}] ok={self.ok} fail={self.failed} total={self.total} "
+              f"elapsed={elapsed:.1f}s rate={rate:.2f} pdf/s")
+
+# ------------------ 워커 프로세스 ------------------
+def _init_worker():
+    """워커마다 자체 연결 풀을 미리 연다. Ctrl+C는 부모 프로세스가 처리"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    get_pool()
+
+def _ingest_in_worker(entry: dict, category: str, domain: str):
+    filepath = os.path.join(entry["source_dir"], entry["filename"])
+    try:
+        ingest_pdf(filepath, category=category, domain=domain, manifest_entry=entry)
+        return None
+    except Exception as e:
+        return str(e)
+
+# ------------------ 실행 모드 ------------------
+def _list_pdfs(pdf_dir: str) -> list[str]:
+    return sorted(f for f in os.listdir(pdf_dir) if f.endswith(".pdf"))
+
+def _ingest_serial(entries: list[dict], category: str, progress: IngestProgress):
+    for entry in entries:
+        filename = entry["filename"]
+        filepath = os.path.join(entry["source_dir"], filename)
         try:
-            ingest_pdf(filepath, category=category, domain="finance")
-            print(f"Successfully ingested: {filename}")
+            ingest_pdf(filepath, category=category, domain="finance", manifest_entry=entry)
+            progress.update(filename)
         except Exception as e:
-            print(f"Error ingesting {filename}: {e}")
+            progress.update(filename, str(e))
+
+def _ingest_parallel(entries: list[dict], category: str, workers: int, progress: IngestProgress):
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    try:
+        futures = {
+            executor.submit(_ingest_in_worker, e, category, "finance"): e["filename"]
+            for e in entries
+        }
+        for fut in as_completed(futures):
+            progress.update(futures[fut], fut.result())
+    except KeyboardInterrupt:
+        # 대기 중인 작업은 취소하고, 진행 중인 PDF만 마무리한 뒤 종료
+        tqdm.write("⏹️ 취소 요청: 실행 중인 작업이 끝나면 종료합니다...")
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+
+def bulk_ingest_main(pdf_dir: str = NAVER_DB_DIR, workers: int = 1, force: bool = False,
+                     pipeline: bool = False, embed_workers: int = 1, queue_size: int = 4, bulk: bool = False,
+                     category: str = "NAVER"):
+    pdf_dir = os.path.abspath(pdf_dir)
+    pdf_files = _list_pdfs(pdf_dir)
+
+    # 매니페스트/인덱스 DDL은 statement_timeout이 걸린 풀 대신 전용 연결에서 수행
+    with psycopg.connect(DB_URL, autocommit=True) as conn:
+        # 매니페스트 기준으로 신규/변경 파일만 적재하고, 사라진 파일은 정리
+        ensure_manifest_table(conn)
+        entries, skipped, deleted = plan_ingest(conn, pdf_dir, pdf_files, force=force)
+        if deleted and not pdf_files:
+            # 마운트가 빠지거나 크롤러 디렉터리가 비면 전체 코퍼스가 삭제되므로 정리하지 않음
+            print(f"⚠️ {pdf_dir}에 PDF가 하나도 없어 삭제 정리를 건너뜁니다 "
+                  f"(매니페스트 {len(deleted)}개 유지, 디렉터리 마운트를 확인하세요)")
+            deleted = []
+        if deleted:
+            prune_deleted(conn, pdf_dir, deleted)
+        # 디렉터리 단위로 출처(카테고리)가 정해지므로, 워커 시작 전에 파티션을 한 번 준비
+        partition = ensure_partition(conn, category)
+        print(f"[{category} → {partition}] Found {len(pdf_files)} PDF files: {len(entries)} to ingest, "
+              f"{skipped} unchanged, {len(deleted)} removed ({workers} worker(s))")
+
+        # --bulk: 적재 대상 파티션의 HNSW 인덱스를 내려두고 적재 후 재생성
+        deferred = {}
+        if bulk and entries:
+            deferred[partition] = drop_partition_index(conn, partition)
+
+        progress = IngestProgress(len(entries))
+        cancelled = False
+        try:
+            if pipeline:
+                # 파싱/임베딩/적재 단계를 겹쳐 실행
+                IngestPipeline(entries, lambda _: category, "finance", progress, parse_workers=workers,
+                               embed_workers=embed_workers, queue_size=queue_size).run()
+            elif workers <= 1:
+                _ingest_serial(entries, category, progress)
+            else:
+                _ingest_parallel(entries, category, workers, progress)
+        except KeyboardInterrupt:
+            cancelled = True
+        finally:
+            progress.close(cancelled=cancelled)
+            # 취소/실패 시에도 검색이 가능하도록 인덱스는 반드시 재생성
+            for partition, index_defs in deferred.items():
+                rebuild_partition_index(partition, index_defs)
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="PDF 일괄 적재")
+    parser.add_argument("--dir", default=NAVER_DB_DIR, help="PDF 디렉터리")
+    parser.add_argument("--category", default="NAVER", type=str.upper,
+                        help=f"적재할 파티션 카테고리 ({', '.join(CATEGORIES)} 또는 새 이름)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("INGEST_WORKERS", "1")),
+                        help="병렬 파싱 프로세스 수 (1이면 순차 실행)")
+    parser.add_argument("--full", action="store_true", help="매니페스트를 무시하고 전체 재적재")
+    parser.add_argument("--pipeline", action="store_true", help="파싱→임베딩→적재 스트리밍 파이프라인 사용")
+    parser.add_argument("--embed-workers", type=int, default=1, help="파이프라인 임베딩 스레드 수")
+    parser.add_argument("--queue-size", type=int, default=4, help="파이프라인 단계 간 큐 크기")
+    parser.add_argument("--bulk", action="store_true", help="HNSW 인덱스를 내리고 적재 후 재생성 (대량 백필용)")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    bulk_ingest_main()
+    args = _parse_args()
+    bulk_ingest_main(args.dir, workers=args.workers, force=args.full, pipeline=args.pipeline,
+                     embed_workers=args.embed_workers, queue_size=args.queue_size, bulk=args.bulk,
+                     category=args.category)
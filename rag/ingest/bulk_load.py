@@ -0,0 +1,75 @@
+import time
+import threading
+import psycopg
+from psycopg import sql
+from core.settings import DB_URL, BULK_MAINTENANCE_WORK_MEM, BULK_PARALLEL_WORKERS
+from db.vector_ops import index_opclass
+from db.partitions import default_index_ddl
+
+# 대량 적재(--bulk): 파티션의 HNSW 인덱스를 내린 상태에서 COPY로 적재한 뒤 한 번에 재생성.
+# 행마다 그래프에 삽입하는 비용 대신 병렬 인덱스 빌드 1회로 대체한다.
+
+def _hnsw_indexes(conn: psycopg.Connection, partition: str) -> list[tuple[str, str]]:
+    return conn.execute(
+        """SELECT indexname, indexdef FROM pg_indexes
+           WHERE schemaname = current_schema() AND tablename = %s AND indexdef ILIKE '%%USING hnsw%%'""",
+        (partition,),
+    ).fetchall()
+
+def drop_partition_index(conn: psycopg.Connection, partition: str) -> list[str]:
+    """파티션의 HNSW 인덱스를 삭제하고, 재생성에 쓸 인덱스 정의(DDL)를 반환"""
+    defs = []
+    for name, indexdef in _hnsw_indexes(conn, partition):
+        print(f"🧹 {partition}: HNSW 인덱스 {name} 삭제 (적재 후 재생성)")
+        conn.execute(sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(name)))
+        # opclass가 VECTOR_METRIC/VECTOR_STORAGE/VECTOR_INDEX_MODE와 다르면 설정 기준으로 재생성
+        ddl = indexdef if index_opclass() in indexdef else default_index_ddl(partition)
+        if ddl not in defs:
+            defs.append(ddl)
+    return defs or [default_index_ddl(partition)]
+
+def _print_progress(conn: psycopg.Connection, relname: str):
+    rows = conn.execute(
+        """SELECT phase,
+                  round(100.0 * blocks_done / nullif(blocks_total, 0), 1) AS progress,
+                  tuples_done, tuples_total
+           FROM pg_stat_progress_create_index
+           WHERE relid = %s::regclass""",
+        (relname,),
+    ).fetchall()
+    for phase, progress, tuples_done, tuples_total in rows:
+        print(f"   ⏳ {relname}: {phase} blocks={progress}% tuples={tuples_done}/{tuples_total}")
+
+def rebuild_partition_index(partition: str, index_defs: list[str], poll_seconds: float = 5.0):
+    """maintenance_work_mem / 병렬 워커를 올려 인덱스를 재생성하고, 진행률 출력 후 ANALYZE"""
+    errors = []
+
+    def _build():
+        try:
+            with psycopg.connect(DB_URL, autocommit=True) as conn:
+                conn.execute(sql.SQL("SET maintenance_work_mem = {}").format(sql.Literal(BULK_MAINTENANCE_WORK_MEM)))
+                conn.execute(sql.SQL("SET max_parallel_maintenance_workers = {}").format(sql.Literal(BULK_PARALLEL_WORKERS)))
+                for ddl in index_defs:
+                    conn.execute(ddl)
+        except Exception as e:
+            errors.append(e)
+
+    started = time.monotonic()
+    print(f"🔨 {partition}: HNSW 인덱스 재생성 시작 (maintenance_work_mem={BULK_MAINTENANCE_WORK_MEM}, "
+          f"workers={BULK_PARALLEL_WORKERS})")
+    builder = threading.Thread(target=_build, daemon=True)
+    builder.start()
+
+    # 인덱싱 진행 상황 확인 (별도 연결에서 pg_stat_progress_create_index 조회)
+    with psycopg.connect(DB_URL, autocommit=True) as mon:
+        while builder.is_alive():
+            builder.join(timeout=poll_seconds)
+            if builder.is_alive():
+                _print_progress(mon, partition)
+        if errors:
+            raise errors[0]
+        print(f"✅ {partition}: 인덱스 재생성 완료 ({time.monotonic() - started:.1f}s)")
+
+        # 통계 갱신
+        mon.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(partition)))
+        print(f"📈 {partition}: ANALYZE 완료")
@@ -1,32 +1,45 @@
 import psycopg
-import json
-from core.settings import DB_URL
-from nodes.router import embed
-from ingest.pdf_to_chunks import extract_text_chunks, extract_tables_json
+from db.pool import get_pool
+from nodes.router import embed_many
+from ingest.pdf_to_chunks import PdfParseError, extract_text_chunks, extract_tables_json
+from ingest.writer import write_document
 
-def ingest_pdf(filepath: str, category: str, domain: str):
-    texts = extract_text_chunks(filepath)
-    tables = extract_tables_json(filepath)
+def parse_pdf(filepath: str):
+    """
+    PDF → (텍스트 청크, 테이블). CPU 작업만 수행.
+    일부라도 추출에 실패했거나 텍스트가 없으면 PdfParseError → 기존 청크 삭제/매니페스트 기록 없이
+    실패로 집계되어 다음 실행에서 다시 시도된다.
+    """
+    errors = []
+    texts = extract_text_chunks(filepath, errors)
+    tables = extract_tables_json(filepath, errors)
+    if errors:
+        raise PdfParseError(f"{len(errors)} extraction error(s): {errors[0]}")
+    if not texts:
+        raise PdfParseError(f"No text extracted from {filepath}")
+    return texts, tables
+
+def embed_document(texts, tables):
+    """텍스트/테이블 청크를 한 번에 배치 임베딩하여 (텍스트 임베딩, 테이블 임베딩) 반환"""
+    embs = embed_many([ch["content"] for ch in texts] + [t["markdown"] for t in tables])
+    return embs[:len(texts)], embs[len(texts):]
+
+def ingest_pdf(filepath: str, category: str, domain: str, conn: psycopg.Connection | None = None,
+               manifest_entry: dict | None = None):
+    """PDF 한 개를 파싱/임베딩하여 적재. conn이 주어지면 해당 연결을 재사용"""
+    texts, tables = parse_pdf(filepath)
+
+    # 텍스트/테이블 청크를 DB 연결 전에 한 번에 배치 임베딩
+    text_embs, table_embs = embed_document(texts, tables)
 
     try:
-        with psycopg.connect(DB_URL, autocommit=True) as conn, conn.cursor() as cur:
-            for ch in texts:
-                emb = embed(ch["content"])
-                cur.execute("""
-                  INSERT INTO documents (chunk_type, content, category, page, filename, embedding)
-                  VALUES ('text', %s, %s, %s, %s, %s)
-                """, (ch["content"], category, ch["page"], ch["filename"], emb))
+        if conn is not None:
+            return write_document(conn, texts, tables, text_embs, table_embs, category, domain,
+                                  manifest_entry=manifest_entry)
 
-            for t in tables:
-                emb = embed(t["markdown"])
-                cur.execute("""
-                  INSERT INTO documents (chunk_type, content, category, page, filename, embedding)
-                  VALUES ('table', %s, %s, %s, %s, %s)
-                """, (t["markdown"], category, t["page"], t["doc_id"], emb))
-                cur.execute("""
-                  INSERT INTO structured_tables (doc_id, page, caption, domain, table_json)
-                  VALUES (%s, %s, %s, %s, %s)
-                """, (t["doc_id"], t["page"], t.get("caption"), domain, json.dumps(t["table_json"])))
+        with get_pool().connection() as conn:
+            return write_document(conn, texts, tables, text_embs, table_embs, category, domain,
+                                  manifest_entry=manifest_entry)
     except Exception as e:
         print(f"Error connecting to DB or executing query: {e}")
         raise
@@ -0,0 +1,152 @@
+import os
+import hashlib
+import psycopg
+from db.generation import bump_generation, ensure_generation_table
+from db.answer_cache import ensure_answer_cache_table, invalidate_files
+
+# 청킹/파싱 방식이 바뀌면 올려서 기존 파일을 재적재하게 한다
+INGEST_VERSION = 4  # 2: 페이지 단위 청킹 + 실제 페이지 번호, 3: 테이블 실제 페이지 번호, 4: report_date/source/broker
+
+def ensure_manifest_table(conn: psycopg.Connection):
+    """적재 매니페스트 테이블과 파일 단위 삭제에 필요한 인덱스 생성 (멱등)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_manifest (
+            filename text NOT NULL,
+            source_dir text NOT NULL,
+            content_hash text NOT NULL,
+            file_size bigint,
+            file_mtime double precision,
+            ingest_version int NOT NULL,
+            category text,
+            chunk_count int,
+            table_count int,
+            first_ingested_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (source_dir, filename)
+        );
+    """)
+    # 예전 filename 단독 PK → (source_dir, filename): 디렉터리가 달라도 파일명이 같으면 서로 덮어쓰던 문제
+    pk = conn.execute("""
+        SELECT array_agg(a.attname::text ORDER BY a.attname)
+        FROM pg_index i JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = 'ingest_manifest'::regclass AND i.indisprimary
+    """).fetchone()[0]
+    if pk == ["filename"]:
+        conn.execute("ALTER TABLE ingest_manifest DROP CONSTRAINT ingest_manifest_pkey, "
+                      "ADD PRIMARY KEY (source_dir, filename);")
+    # 청크/테이블이 어느 디렉터리 파일에서 왔는지 (파일 단위 교체/삭제 범위). 이전 적재분은 NULL
+    conn.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS source_dir text;")
+    conn.execute("ALTER TABLE structured_tables ADD COLUMN IF NOT EXISTS source_dir text;")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ingest_manifest_hash ON ingest_manifest (content_hash);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ingest_manifest_dir ON ingest_manifest (source_dir);")
+    # 변경/삭제된 파일의 기존 청크를 지울 때 사용
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_filename ON documents (filename);")
+    # (doc_id, page) 조회(db/deps.py)와 doc_id 단독 삭제를 모두 처리 → 예전 doc_id 단일 인덱스는 제거
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_structured_tables_doc_page ON structured_tables (doc_id, page);")
+    conn.execute("DROP INDEX IF EXISTS idx_structured_tables_doc;")
+    ensure_generation_table(conn)
+    ensure_answer_cache_table(conn)
+
+def file_sha256(path: str, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for b in iter(lambda: f.read(chunk), b""):
+            h.update(b)
+    return h.hexdigest()
+
+def load_manifest(conn: psycopg.Connection, source_dir: str) -> dict[str, dict]:
+    """source_dir의 매니페스트를 한 번에 읽어 filename → 항목 dict로 반환"""
+    cur = conn.execute(
+        """SELECT filename, content_hash, file_size, file_mtime, ingest_version
+           FROM ingest_manifest WHERE source_dir = %s""",
+        (source_dir,),
+    )
+    return {
+        r[0]: {"content_hash": r[1], "file_size": r[2], "file_mtime": r[3], "ingest_version": r[4]}
+        for r in cur.fetchall()
+    }
+
+def plan_ingest(conn: psycopg.Connection, source_dir: str, filenames: list[str], force: bool = False):
+    """
+    적재 대상 계획 수립.
+    - 크기/수정시각/버전이 같으면 해시 없이 건너뜀
+    - 해시가 같으면 stat만 갱신하고 건너뜀
+    반환값: (적재할 항목 리스트, 건너뛴 개수, 디렉터리에서 사라진 파일명 리스트)
+    """
+    manifest = load_manifest(conn, source_dir)
+    todo, skipped, touched = [], 0, []
+
+    for filename in filenames:
+        path = os.path.join(source_dir, filename)
+        st = os.stat(path)
+        prev = manifest.get(filename)
+        current = prev is not None and prev["ingest_version"] == INGEST_VERSION and not force
+
+        if current and prev["file_size"] == st.st_size and prev["file_mtime"] == st.st_mtime:
+            skipped += 1
+            continue
+
+        content_hash = file_sha256(path)
+        if current and prev["content_hash"] == content_hash:
+            touched.append((st.st_size, st.st_mtime, source_dir, filename))
+            skipped += 1
+            continue
+
+        todo.append({
+            "filename": filename,
+            "source_dir": source_dir,
+            "content_hash": content_hash,
+            "file_size": st.st_size,
+            "file_mtime": st.st_mtime,
+        })
+
+    if touched:
+        with conn.cursor() as cur:
+            cur.executemany(
+                "UPDATE ingest_manifest SET file_size = %s, file_mtime = %s "
+                "WHERE source_dir = %s AND filename = %s",
+                touched,
+            )
+
+    present = set(filenames)
+    deleted = [f for f in manifest if f not in present]
+    return todo, skipped, deleted
+
+def delete_document_rows(cur, filename: str, source_dir: str):
+    """source_dir의 filename 청크/테이블 삭제 (source_dir가 NULL인 이전 적재분 포함)"""
+    cur.execute("DELETE FROM documents WHERE filename = %s AND (source_dir = %s OR source_dir IS NULL)",
+                (filename, source_dir))
+    cur.execute("DELETE FROM structured_tables WHERE doc_id = %s AND (source_dir = %s OR source_dir IS NULL)",
+                (filename, source_dir))
+    # 이 파일을 근거로 만든 캐시 답변도 함께 무효화
+    invalidate_files(cur, [filename])
+
+def record_ingest(cur, entry: dict, category: str, chunk_count: int, table_count: int):
+    cur.execute(
+        """INSERT INTO ingest_manifest
+             (filename, source_dir, content_hash, file_size, file_mtime, ingest_version,
+              category, chunk_count, table_count)
+           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+           ON CONFLICT (source_dir, filename) DO UPDATE SET
+             content_hash = EXCLUDED.content_hash,
+             file_size = EXCLUDED.file_size,
+             file_mtime = EXCLUDED.file_mtime,
+             ingest_version = EXCLUDED.ingest_version,
+             category = EXCLUDED.category,
+             chunk_count = EXCLUDED.chunk_count,
+             table_count = EXCLUDED.table_count,
+             updated_at = now()""",
+        (entry["filename"], entry["source_dir"], entry["content_hash"], entry["file_size"],
+         entry["file_mtime"], INGEST_VERSION, category, chunk_count, table_count),
+    )
+
+def prune_deleted(conn: psycopg.Connection, source_dir: str, filenames: list[str]):
+    """source_dir에서 사라진 파일의 청크/테이블/매니페스트 항목을 파일 단위 트랜잭션으로 삭제"""
+    for filename in filenames:
+        with conn.transaction(), conn.cursor() as cur:
+            delete_document_rows(cur, filename, source_dir)
+            cur.execute("DELETE FROM ingest_manifest WHERE source_dir = %s AND filename = %s RETURNING category",
+                        (source_dir, filename))
+            row = cur.fetchone()
+            if row and row[0]:
+                bump_generation(cur, row[0])
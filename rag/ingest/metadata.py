@@ -0,0 +1,42 @@
+import os
+import re
+import unicodedata
+from datetime import date
+from functools import lru_cache
+
+# 크롤러가 저장하는 파일명에서 리포트 메타데이터 추출
+#   naver_research: "(YYYY-MM-DD) 제목 - 회사.pdf"  (naver_research.build_filename)
+# 파일명 규칙이 다른 출처는 날짜만 최대한 추출하고 broker는 비워 둔다.
+
+# 카테고리(파티션) → 크롤러의 source 값
+CATEGORY_SOURCES = {"NAVER": "naver_research"}
+
+_NAVER_RE = re.compile(r"^\((\d{4}-\d{2}-\d{2})\)\s*(.+)$")
+_DATE_RE = re.compile(r"(20\d{2}|19\d{2})[-._]?(\d{2})[-._]?(\d{2})")
+
+def _to_date(y: str, m: str, d: str) -> date | None:
+    try:
+        return date(int(y), int(m), int(d))
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
+def parse_report_metadata(filename: str, category: str) -> dict:
+    """파일명 → {"report_date", "source", "broker"} (알 수 없는 값은 None)"""
+    # macOS/NAS에서 넘어온 NFD 파일명도 같은 규칙으로 처리
+    stem = unicodedata.normalize("NFC", os.path.splitext(os.path.basename(filename))[0]).strip()
+    meta = {"report_date": None, "source": CATEGORY_SOURCES.get(category, category.lower()), "broker": None}
+
+    m = _NAVER_RE.match(stem)
+    if m:
+        meta["report_date"] = _to_date(*m.group(1).split("-"))
+        # 회사명은 마지막 " - " 뒤 (제목이나 'e-Best투자증권'처럼 회사명에 '-'가 있어도 유지)
+        rest = m.group(2)
+        if " - " in rest:
+            meta["broker"] = rest.rsplit(" - ", 1)[1].strip() or None
+        return meta
+
+    m = _DATE_RE.search(stem)
+    if m:
+        meta["report_date"] = _to_date(*m.groups())
+    return meta
@@ -1,53 +1,119 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
 import os
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+import pymupdf
 import pymupdf4llm
 import camelot
 import json
+from core.settings import TABLE_PRESCREEN
 
-def _extract_raw_text(filepath: str) -> str:
-    """pymupdf4llm을 사용하여 PDF에서 텍스트 추출"""
+_splitter = RecursiveCharacterTextSplitter(
+    chunk_size=800, chunk_overlap=120, separators=["\n\n", "\n", " ", ""]
+)
+
+class PdfParseError(RuntimeError):
+    """PDF 열기/페이지/테이블 추출 실패 또는 텍스트 없음 (적재하지 않고 기존 청크 유지)"""
+
+def _record(errors: List[str] | None, msg: str):
+    print(msg)
+    if errors is not None:
+        errors.append(msg)
+
+def iter_page_markdown(filepath: str, errors: List[str] | None = None) -> Iterator[Tuple[int, str]]:
+    """
+    pymupdf4llm으로 한 페이지씩 markdown 변환하여 (페이지 번호, 텍스트)를 순차 반환.
+    errors가 주어지면 열기/페이지 실패 메시지를 모은다 (실패한 페이지는 건너뛰고 계속).
+    """
     try:
-        # pymupdf4llm으로 PDF 텍스트 추출
-        md_text = pymupdf4llm.to_markdown(filepath)
-        return md_text
+        doc = pymupdf.open(filepath)
     except Exception as e:
-        print(f"Error extracting text from {filepath}: {e}")
-        return ""
+        _record(errors, f"Error extracting text from {filepath}: {e}")
+        return
 
-def extract_text_chunks(filepath: str) -> List[Dict[str, Any]]:
-    """PDF에서 텍스트를 추출하고 청크로 분할"""
-    raw = _extract_raw_text(filepath)
-    if not raw:
-        return []
-    
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=800, chunk_overlap=120, separators=["\n\n", "\n", " ", ""]
-    )
-    chunks = splitter.split_text(raw)
-    
-    # 파일명에서 페이지 정보 추출 시도
+    with doc:
+        # 헤더 글꼴 크기 분석은 문서 전체를 한 번만 (페이지마다 하면 전체 추출이 P번 반복되어 O(P²)),
+        # 모든 페이지가 같은 헤더 레벨 기준을 쓰도록 hdr_info로 전달
+        hdr = pymupdf4llm.IdentifyHeaders(doc)
+        for pno in range(doc.page_count):
+            try:
+                md_text = pymupdf4llm.to_markdown(doc, pages=[pno], hdr_info=hdr, show_progress=False)
+            except Exception as e:
+                _record(errors, f"Error extracting text from {filepath} p.{pno + 1}: {e}")
+                continue
+            finally:
+                # MuPDF 내부 캐시(폰트/이미지)를 비워 페이지 수와 무관하게 메모리 유지
+                pymupdf.TOOLS.store_shrink(100)
+            if md_text.strip():
+                yield pno + 1, md_text
+
+def iter_text_chunks(filepath: str, errors: List[str] | None = None) -> Iterator[Dict[str, Any]]:
+    """페이지 단위로 청크를 만들어 실제 페이지 번호와 함께 순차 반환 (메모리에는 한 페이지만 유지)"""
     filename = os.path.basename(filepath)
-    chunks_with_metadata = []
-    
-    for i, chunk in enumerate(chunks):
-        chunks_with_metadata.append({
-            "content": chunk,
-            "page": i + 1,  # 페이지 번호는 청크 순서로 설정
-            "filename": filename,
-            "chunk_type": "text"
-        })
-    
-    return chunks_with_metadata
+    for page, md_text in iter_page_markdown(filepath, errors):
+        for chunk in _splitter.split_text(md_text):
+            yield {
+                "content": chunk,
+                "page": page,
+                "filename": filename,
+                "chunk_type": "text"
+            }
+
+def extract_text_chunks(filepath: str, errors: List[str] | None = None) -> List[Dict[str, Any]]:
+    """PDF에서 텍스트를 추출하고 청크로 분할"""
+    return list(iter_text_chunks(filepath, errors))
+
+def _has_ruling_lines(page, min_lines: int = 2, min_len: float = 20.0) -> bool:
+    """벡터 드로잉에서 가로/세로 선이 각각 min_lines 이상이면 괘선 표 후보로 판단"""
+    horizontal = vertical = 0
+    for path in page.get_drawings():
+        for item in path["items"]:
+            if item[0] == "l":
+                p1, p2 = item[1], item[2]
+                dx, dy = abs(p2.x - p1.x), abs(p2.y - p1.y)
+                if dy < 1 and dx >= min_len:
+                    horizontal += 1
+                elif dx < 1 and dy >= min_len:
+                    vertical += 1
+            elif item[0] == "re":
+                r = item[1]
+                if r.height < 2 and r.width >= min_len:      # 얇은 사각형 = 가로선
+                    horizontal += 1
+                elif r.width < 2 and r.height >= min_len:    # 얇은 사각형 = 세로선
+                    vertical += 1
+                elif r.width >= min_len and r.height >= min_len:  # 셀 테두리
+                    horizontal += 2
+                    vertical += 2
+            if horizontal >= min_lines and vertical >= min_lines:
+                return True
+    return False
+
+def find_table_pages(filepath: str, method: str = TABLE_PRESCREEN) -> List[int]:
+    """camelot 실행 전, 괘선 표가 있을 법한 페이지(1-based)만 빠르게 추림"""
+    with pymupdf.open(filepath) as doc:
+        if method == "off":
+            return list(range(1, doc.page_count + 1))
+        pages = []
+        for pno in range(doc.page_count):
+            page = doc[pno]
+            if method == "find_tables":
+                found = bool(page.find_tables(strategy="lines").tables)
+            else:
+                found = _has_ruling_lines(page)
+            if found:
+                pages.append(pno + 1)
+        return pages
 
-def extract_tables_json(filepath: str) -> List[Dict[str, Any]]:
-    """PDF에서 테이블을 추출하여 JSON 형태로 변환"""
+def extract_tables_json(filepath: str, errors: List[str] | None = None) -> List[Dict[str, Any]]:
+    """PDF에서 테이블을 추출하여 JSON 형태로 변환 (errors가 주어지면 실패 메시지를 모음)"""
     tables = []
     filename = os.path.basename(filepath)
     
     try:
-        # camelot으로 테이블 추출
-        pdf_tables = camelot.read_pdf(filepath, pages='all', flavor='lattice')
+        # 후보 페이지에서만 camelot으로 테이블 추출
+        table_pages = find_table_pages(filepath)
+        if not table_pages:
+            return []
+        pdf_tables = camelot.read_pdf(filepath, pages=",".join(map(str, table_pages)), flavor='lattice')
         
         for i, table in enumerate(pdf_tables):
             if table.df.empty:
@@ -63,7 +129,7 @@ def extract_tables_json(filepath: str) -> List[Dict[str, Any]]:
             
             tables.append({
                 "doc_id": filename,
-                "page": i + 1,
+                "page": int(table.page),
                 "caption": f"Table {i + 1}",
                 "domain": "energy",  # 기본 도메인
                 "markdown": markdown_table,
@@ -74,7 +140,7 @@ def extract_tables_json(filepath: str) -> List[Dict[str, Any]]:
             })
             
     except Exception as e:
-        print(f"Error extracting tables from {filepath}: {e}")
+        _record(errors, f"Error extracting tables from {filepath}: {e}")
         # 에러 발생 시 빈 리스트 반환
         return []
     
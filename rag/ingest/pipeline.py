@@ -0,0 +1,204 @@
+import os
+import time
+import queue
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from db.pool import get_pool
+from ingest.etl import parse_pdf, embed_document
+from ingest.writer import write_document
+
+# 파싱(프로세스) → 임베딩(스레드) → DB 적재(스레드)를 bounded queue로 연결한 스트리밍 파이프라인.
+# 큐가 가득 차면 앞 단계가 대기하므로(backpressure) 메모리 사용량이 제한된다.
+
+_DONE = object()
+
+class StageStats:
+    """단계별 처리/대기 시간 집계. busy 비율이 가장 높은 단계가 병목"""
+
+    def __init__(self, name: str, concurrency: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.items = 0
+        self.rows = 0
+        self.busy = 0.0      # 실제 작업 시간
+        self.starved = 0.0   # 입력 큐가 비어 기다린 시간
+        self.blocked = 0.0   # 출력 큐가 가득 차 기다린 시간
+        self._lock = threading.Lock()
+
+    def add(self, busy: float = 0.0, starved: float = 0.0, blocked: float = 0.0, items: int = 0, rows: int = 0):
+        with self._lock:
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+            self.items += items
+            self.rows += rows
+
+    def utilisation(self, wall: float) -> float:
+        return self.busy / (wall * self.concurrency) if wall > 0 else 0.0
+
+def _init_parse_worker():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _parse_in_worker(filepath: str):
+    t0 = time.perf_counter()
+    texts, tables = parse_pdf(filepath)
+    return texts, tables, time.perf_counter() - t0
+
+class IngestPipeline:
+    def __init__(self, entries: list[dict], category_of, domain: str, progress,
+                 parse_workers: int = 2, embed_workers: int = 1, queue_size: int = 4):
+        self.entries = entries
+        self.category_of = category_of
+        self.domain = domain
+        self.progress = progress
+        self.parse_workers = max(1, parse_workers)
+        self.embed_workers = max(1, embed_workers)
+        self.parse_q: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.write_q: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.stop = threading.Event()
+        self.stats = {
+            "parse": StageStats("parse", self.parse_workers),
+            "embed": StageStats("embed", self.embed_workers),
+            "write": StageStats("write", 1),
+        }
+        self._embed_alive = self.embed_workers
+        self._lock = threading.Lock()
+        self._executor = None
+
+    # ------------------ 큐 헬퍼 (취소 가능) ------------------
+    def _get(self, q: queue.Queue, stats: StageStats):
+        t0 = time.perf_counter()
+        while not self.stop.is_set():
+            try:
+                item = q.get(timeout=0.5)
+                stats.add(starved=time.perf_counter() - t0)
+                return item
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _put(self, q: queue.Queue, item, stats: StageStats) -> bool:
+        t0 = time.perf_counter()
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                stats.add(blocked=time.perf_counter() - t0)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # ------------------ 단계 ------------------
+    def _parse_stage(self):
+        st = self.stats["parse"]
+        pending = iter(self.entries)
+        inflight = {}
+        # 큐 외에 프로세스 풀에도 작업을 과도하게 쌓지 않도록 동시 제출 수 제한
+        limit = self.parse_workers * 2
+        try:
+            while not self.stop.is_set():
+                while len(inflight) < limit:
+                    entry = next(pending, None)
+                    if entry is None:
+                        break
+                    path = os.path.join(entry["source_dir"], entry["filename"])
+                    inflight[self._executor.submit(_parse_in_worker, path)] = entry
+                if not inflight:
+                    break
+                done, _ = wait(inflight, timeout=0.5, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    entry = inflight.pop(fut)
+                    try:
+                        texts, tables, busy = fut.result()
+                        st.add(busy=busy, items=1)
+                        item = (entry, (texts, tables), None)
+                    except Exception as e:
+                        item = (entry, None, str(e))
+                    if not self._put(self.parse_q, item, st):
+                        return
+        finally:
+            self._put(self.parse_q, _DONE, st)
+
+    def _embed_stage(self):
+        st = self.stats["embed"]
+        try:
+            while True:
+                item = self._get(self.parse_q, st)
+                if item is _DONE:
+                    # 다른 임베딩 스레드도 종료하도록 다시 넣어 둠
+                    self._put(self.parse_q, _DONE, st)
+                    break
+                entry, payload, err = item
+                if err is None:
+                    t0 = time.perf_counter()
+                    try:
+                        text_embs, table_embs = embed_document(*payload)
+                        payload = (*payload, text_embs, table_embs)
+                    except Exception as e:
+                        err = str(e)
+                    st.add(busy=time.perf_counter() - t0, items=1)
+                if not self._put(self.write_q, (entry, payload, err), st):
+                    break
+        finally:
+            with self._lock:
+                self._embed_alive -= 1
+                last = self._embed_alive == 0
+            if last:
+                self._put(self.write_q, _DONE, st)
+
+    def _write_stage(self):
+        st = self.stats["write"]
+        with get_pool().connection() as conn:
+            while True:
+                item = self._get(self.write_q, st)
+                if item is _DONE:
+                    break
+                entry, payload, err = item
+                if err is None:
+                    t0 = time.perf_counter()
+                    try:
+                        rows = write_document(conn, *payload, self.category_of(entry["filename"]), self.domain,
+                                              manifest_entry=entry)
+                        st.add(rows=rows)
+                    except Exception as e:
+                        err = str(e)
+                    st.add(busy=time.perf_counter() - t0, items=1)
+                self.progress.update(entry["filename"], err)
+
+    # ------------------ 실행 ------------------
+    def run(self):
+        started = time.perf_counter()
+        self._executor = ProcessPoolExecutor(max_workers=self.parse_workers, initializer=_init_parse_worker)
+        threads = [threading.Thread(target=self._parse_stage, name="parse", daemon=True)]
+        threads += [threading.Thread(target=self._embed_stage, name=f"embed-{i}", daemon=True)
+                    for i in range(self.embed_workers)]
+        writer = threading.Thread(target=self._write_stage, name="write", daemon=True)
+        threads.append(writer)
+        for t in threads:
+            t.start()
+        try:
+            while writer.is_alive():
+                writer.join(timeout=0.5)
+        except KeyboardInterrupt:
+            # 진행 중인 PDF 파싱만 마무리하고 나머지는 버림
+            self.stop.set()
+            for t in threads:
+                t.join()
+            raise
+        finally:
+            self.stop.set()
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self.report(time.perf_counter() - started)
+
+    def report(self, wall: float):
+        print(f"\n📊 파이프라인 단계별 지표 (wall {wall:.1f}s)")
+        print(f"{'stage':<6} {'items':>6} {'busy(s)':>9} {'util':>6} {'starved(s)':>11} {'blocked(s)':>11}")
+        for st in self.stats.values():
+            print(f"{st.name:<6} {st.items:>6} {st.busy:>9.1f} {st.utilisation(wall):>6.0%} "
+                  f"{st.starved:>11.1f} {st.blocked:>11.1f}")
+        w = self.stats["write"]
+        if w.busy > 0:
+            print(f"DB rows: {w.rows} ({w.rows / w.busy:.0f} rows/s while writing)")
+        bottleneck = max(self.stats.values(), key=lambda s: s.utilisation(wall))
+        print(f"병목 단계: {bottleneck.name}")
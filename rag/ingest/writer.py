@@ -0,0 +1,116 @@
+import json
+import struct
+import psycopg
+from psycopg.adapt import Dumper
+from psycopg.pq import Format
+from psycopg.types import TypeInfo
+from core.settings import INGEST_COPY_FORMAT
+from ingest.manifest import delete_document_rows, record_ingest
+from ingest.metadata import parse_report_metadata
+from db.partitions import ensure_partition
+from db.generation import bump_generation
+from db.vector_ops import vector_type
+
+DOC_COLUMNS = "(chunk_type, content, category, page, filename, source_dir, report_date, source, broker, embedding)"
+TABLE_COLUMNS = "(doc_id, page, caption, domain, source_dir, table_json)"
+
+# ------------------ pgvector 인코딩 ------------------
+class _VectorBinaryDumper(Dumper):
+    """pgvector binary 포맷: int16 dim, int16 unused, float4[dim] (big-endian)"""
+    format = Format.BINARY
+    _elem = "f"
+
+    def dump(self, obj):
+        return struct.pack(f">HH{len(obj)}{self._elem}", len(obj), 0, *obj)
+
+class _HalfvecBinaryDumper(_VectorBinaryDumper):
+    """halfvec binary 포맷: float4 대신 float2[dim]"""
+    _elem = "e"
+
+_DUMPERS = {"vector": _VectorBinaryDumper, "halfvec": _HalfvecBinaryDumper}
+
+def _vector_text(emb) -> str:
+    return "[" + ",".join(repr(float(x)) for x in emb) + "]"
+
+_vector_oids: dict[tuple, int] = {}
+def _register_vector(conn: psycopg.Connection, type_name: str | None = None) -> int:
+    """연결에 vector/halfvec 타입 binary dumper를 등록하고 oid를 반환 (DB별 1회 조회)"""
+    type_name = type_name or vector_type()
+    key = (conn.info.host, conn.info.port, conn.info.dbname, type_name)
+    oid = _vector_oids.get(key)
+    if oid is None:
+        info = TypeInfo.fetch(conn, type_name)
+        if info is None:
+            raise RuntimeError(f"pgvector '{type_name}' 타입을 찾을 수 없습니다. CREATE EXTENSION vector 를 확인하세요.")
+        oid = _vector_oids[key] = info.oid
+    dumper = type(f"{type_name.title()}BinaryDumper", (_DUMPERS[type_name],), {"oid": oid})
+    conn.adapters.register_dumper(None, dumper)
+    return oid
+
+def _clean(s: str | None) -> str | None:
+    # PostgreSQL text는 NUL 문자를 허용하지 않음
+    return s.replace("\x00", "") if s else s
+
+# ------------------ 행 구성 ------------------
+def _meta(filename: str, category: str) -> tuple:
+    m = parse_report_metadata(filename, category)
+    return m["report_date"], m["source"], m["broker"]
+
+def _document_rows(texts, tables, text_embs, table_embs, category: str, source_dir: str | None = None):
+    for ch, emb in zip(texts, text_embs):
+        yield ("text", _clean(ch["content"]), category, ch["page"], ch["filename"], source_dir,
+               *_meta(ch["filename"], category), emb)
+    for t, emb in zip(tables, table_embs):
+        yield ("table", _clean(t["markdown"]), category, t["page"], t["doc_id"], source_dir,
+               *_meta(t["doc_id"], category), emb)
+
+def _copy_documents(cur, rows, fmt: str):
+    if fmt == "binary":
+        oid = _register_vector(cur.connection)
+        with cur.copy(f"COPY documents {DOC_COLUMNS} FROM STDIN WITH (FORMAT BINARY)") as copy:
+            copy.set_types(["text", "text", "text", "int4", "text", "text", "date", "text", "text", oid])
+            for row in rows:
+                copy.write_row(row)
+        return
+
+    with cur.copy(f"COPY documents {DOC_COLUMNS} FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row((*row[:-1], _vector_text(row[-1])))
+
+def _copy_structured_tables(cur, tables, domain: str, source_dir: str | None = None):
+    if not tables:
+        return
+    # table_json 컬럼 타입(json/jsonb)에 무관하도록 text 포맷으로 전송
+    with cur.copy(f"COPY structured_tables {TABLE_COLUMNS} FROM STDIN") as copy:
+        for t in tables:
+            copy.write_row((t["doc_id"], t["page"], _clean(t.get("caption")), domain, source_dir,
+                            _clean(json.dumps(t["table_json"], ensure_ascii=False))))
+
+def write_document(conn: psycopg.Connection, texts, tables, text_embs, table_embs,
+                   category: str, domain: str, fmt: str = INGEST_COPY_FORMAT,
+                   manifest_entry: dict | None = None) -> int:
+    """
+    PDF 한 개의 청크/테이블을 COPY로 한 트랜잭션에 적재. 실패 시 전체 롤백. 적재 행 수 반환.
+    manifest_entry가 주어지면 기존 청크 교체와 매니페스트 기록도 같은 트랜잭션에서 수행.
+    """
+    if manifest_entry and not texts:
+        # 빈 파싱 결과로 기존 청크를 지우고 적재 완료로 기록하지 않도록
+        raise ValueError(f"No text chunks for {manifest_entry['filename']}; keeping previous rows")
+    source_dir = manifest_entry["source_dir"] if manifest_entry else None
+    rows = list(_document_rows(texts, tables, text_embs, table_embs, category, source_dir))
+    # 처음 보는 카테고리면 파티션(+인덱스)을 별도 트랜잭션으로 먼저 생성
+    ensure_partition(conn, category)
+    with conn.transaction(), conn.cursor() as cur:
+        # 풀 연결의 statement_timeout(DB_STATEMENT_TIMEOUT_MS)은 검색용. 큰 PDF의 COPY/HNSW 삽입이
+        # 중간에 끊기지 않도록 이 트랜잭션에서만 해제 (커밋/롤백 시 원래 값으로 복원)
+        cur.execute("SET LOCAL statement_timeout = 0")
+        if manifest_entry:
+            # 이전 적재분(매니페스트 도입 전 중복 포함)을 같은 트랜잭션에서 교체
+            delete_document_rows(cur, manifest_entry["filename"], source_dir)
+        _copy_documents(cur, rows, fmt)
+        _copy_structured_tables(cur, tables, domain, source_dir)
+        if manifest_entry:
+            record_ingest(cur, manifest_entry, category, len(texts), len(tables))
+        # 커밋과 함께 이 카테고리의 검색 결과 캐시 무효화
+        bump_generation(cur, category)
+    return len(rows)
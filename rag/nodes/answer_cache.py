@@ -0,0 +1,51 @@
+from typing import Dict
+from core.settings import ANSWER_CACHE_ENABLED, ANSWER_CACHE_SAME_GENERATION
+from db import answer_cache
+from db.deps import corpus_generations
+
+_FAILED_ANSWERS = ("죄송합니다.", "I don't have information")
+
+def _usable(state: Dict) -> bool:
+    # 대화 히스토리가 있으면 답변이 앞선 대화에 의존하므로 캐시를 쓰지 않음
+    return ANSWER_CACHE_ENABLED and not state.get("history") and state.get("query_embedding") is not None
+
+def _categories(state: Dict):
+    return sorted(state.get("categories") or [state["category"]])
+
+def node_answer_cache(state: Dict):
+    """router 직후: 비슷한 질문의 최종 답변이 있으면 에이전트 실행 없이 재사용"""
+    state["cache_hit"] = False
+    if not _usable(state):
+        return state
+
+    categories = _categories(state)
+    hit = answer_cache.lookup(state["query_embedding"], categories, state.get("filters"))
+    if hit is None:
+        return state
+    if ANSWER_CACHE_SAME_GENERATION:
+        gens = corpus_generations() or {}
+        if any(hit["generations"].get(c, 0) != gens.get(c, 0) for c in categories):
+            return state
+
+    print(f"♻️ 답변 캐시 적중 (유사도 {hit['similarity']:.3f}): {hit['query']}")
+    state["cache_hit"] = True
+    state["answer_cache_id"] = hit["id"]
+    state["final"] = hit["final"]
+    state["candidates"] = hit["evidence"]
+    return state
+
+def route_answer_cache(state: Dict) -> str:
+    return "hit" if state.get("cache_hit") else "miss"
+
+def node_answer_cache_store(state: Dict):
+    """explainer 이후: 새로 생성한 최종 답변을 캐시에 저장"""
+    final = state.get("final") or ""
+    if not _usable(state) or state.get("cache_hit") or not final or final.startswith(_FAILED_ANSWERS):
+        return state
+    try:
+        answer_cache.store(state["query"], state["query_embedding"], _categories(state), state.get("filters"),
+                           final, state.get("candidates", [])[:8], corpus_generations())
+    except Exception as e:
+        # 캐시 저장 실패가 답변 자체를 막으면 안 됨
+        print(f"⚠️ 답변 캐시 저장 실패: {e}")
+    return state
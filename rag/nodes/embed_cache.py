@@ -0,0 +1,115 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import List, Optional
+import numpy as np
+from core.settings import EMBED_CACHE_ENABLED, EMBED_CACHE_PATH, EMBED_CACHE_MAX_ENTRIES, EMBED_CACHE_TOUCH_SECONDS
+
+# 임베딩 캐시: (model, dims, sha256(text)) → float32 벡터. 오래 안 쓴 항목부터 제거
+_local = threading.local()
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+_puts_since_check = 0   # 여러 임베딩 스레드가 갱신하므로 _evict_lock으로 보호
+_evict_lock = threading.Lock()
+_EVICT_CHECK_EVERY = 1000
+
+def _conn() -> sqlite3.Connection:
+    """스레드/프로세스마다 별도 연결 (sqlite 연결은 공유하지 않음)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "pid", None) == os.getpid():
+        return conn
+    os.makedirs(os.path.dirname(os.path.abspath(EMBED_CACHE_PATH)), exist_ok=True)
+    conn = sqlite3.connect(EMBED_CACHE_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS embeddings (
+            model TEXT NOT NULL,
+            dims INTEGER NOT NULL,
+            text_hash BLOB NOT NULL,
+            vec BLOB NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (model, dims, text_hash)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+    _local.conn, _local.pid = conn, os.getpid()
+    return conn
+
+def _hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+def get_many(model: str, dims: int, texts: List[str]) -> List[Optional[List[float]]]:
+    """캐시 조회. 없는 항목은 None"""
+    if not EMBED_CACHE_ENABLED or not texts:
+        return [None] * len(texts)
+    conn = _conn()
+    hashes = [_hash(t) for t in texts]
+    found = {}
+    # sqlite 바인딩 변수 개수 제한을 피하기 위해 나눠서 조회
+    for i in range(0, len(hashes), 500):
+        part = list(set(hashes[i:i + 500]))
+        marks = ",".join("?" * len(part))
+        rows = conn.execute(
+            f"SELECT text_hash, vec, last_used FROM embeddings WHERE model = ? AND dims = ? AND text_hash IN ({marks})",
+            (model, dims, *part),
+        ).fetchall()
+        found.update((h, (vec, used)) for h, vec, used in rows)
+
+    # LRU 갱신은 오래된 항목만: 읽기마다 UPDATE하면 병렬 적재 워커가 sqlite 쓰기 잠금을 두고 경쟁
+    now = time.time()
+    stale = [h for h, (_, used) in found.items() if now - used > EMBED_CACHE_TOUCH_SECONDS]
+    if stale:
+        with conn:
+            conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND dims = ? AND text_hash = ?",
+                [(now, model, dims, h) for h in stale],
+            )
+
+    out = [np.frombuffer(found[h][0], dtype=np.float32).tolist() if h in found else None for h in hashes]
+    hits = sum(v is not None for v in out)
+    with _stats_lock:
+        _stats["hits"] += hits
+        _stats["misses"] += len(out) - hits
+    return out
+
+def put_many(model: str, dims: int, texts: List[str], embs: List[List[float]]):
+    global _puts_since_check
+    if not EMBED_CACHE_ENABLED or not texts:
+        return
+    conn = _conn()
+    now = time.time()
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, dims, text_hash, vec, last_used) VALUES (?, ?, ?, ?, ?)",
+            [(model, dims, _hash(t), np.asarray(e, dtype=np.float32).tobytes(), now) for t, e in zip(texts, embs)],
+        )
+    with _evict_lock:
+        _puts_since_check += len(texts)
+        due = _puts_since_check >= _EVICT_CHECK_EVERY
+        if due:
+            _puts_since_check = 0
+    if due:
+        _evict(conn)
+
+def _evict(conn: sqlite3.Connection):
+    """항목 수가 상한을 넘으면 최근 사용 시각이 오래된 순으로 90%까지 줄임"""
+    count = conn.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+    if count <= EMBED_CACHE_MAX_ENTRIES:
+        return
+    excess = count - int(EMBED_CACHE_MAX_ENTRIES * 0.9)
+    with conn:
+        conn.execute(
+            """DELETE FROM embeddings WHERE (model, dims, text_hash) IN (
+                 SELECT model, dims, text_hash FROM embeddings ORDER BY last_used LIMIT ?)""",
+            (excess,),
+        )
+
+def stats() -> dict:
+    with _stats_lock:
+        s = dict(_stats)
+    total = s["hits"] + s["misses"]
+    s["hit_rate"] = s["hits"] / total if total else 0.0
+    return s
@@ -0,0 +1,63 @@
+import json
+from typing import Dict, List
+from core.settings import PROVIDER, CHAT_MODEL, OLLAMA_HOST, OLLAMA_CHAT_MODEL
+from core.clients import get_openai, get_http_session
+
+# 에이전트 공용 채팅 호출 (OpenAI / Ollama 모두 stream=True).
+# 그래프 안에서 실행되면 토큰을 LangGraph custom 스트림으로 흘려보내고(stream_mode="custom"),
+# 반환값은 항상 전체 답변 문자열이라 노드 로직은 그대로 유지된다.
+
+def _writer():
+    """그래프 실행 중이면 custom 스트림 writer, 아니면(스크립트/벤치마크 호출) no-op"""
+    try:
+        from langgraph.config import get_stream_writer
+        return get_stream_writer()
+    except Exception:
+        return lambda _: None
+
+def _ollama_tokens(messages: List[Dict], temperature: float):
+    payload = {
+        "model": OLLAMA_CHAT_MODEL,
+        "messages": messages,
+        "stream": True,
+        "options": {"temperature": temperature},
+    }
+    with get_http_session().post(f"{OLLAMA_HOST}/api/chat", json=payload, timeout=180, stream=True) as r:
+        r.raise_for_status()
+        # NDJSON: 줄마다 {"message": {"content": "..."}, "done": false}
+        for line in r.iter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            token = (data.get("message") or {}).get("content")
+            if token:
+                yield token
+            if data.get("done"):
+                break
+
+def _openai_tokens(messages: List[Dict], temperature: float, max_tokens: int):
+    stream = get_openai().chat.completions.create(
+        model=CHAT_MODEL,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def chat(messages: List[Dict], temperature: float = 0.0, max_tokens: int = 4000, phase: str = "answer") -> str:
+    """
+    스트리밍 채팅 호출. phase: UI가 어떤 답변의 토큰인지 구분하는 라벨
+    (예: "answer" 초안 → "reflection" 개선본이 오면 화면을 새 답변으로 교체)
+    """
+    write = _writer()
+    write({"phase": phase, "start": True})
+    tokens = _ollama_tokens(messages, temperature) if PROVIDER == "ollama" else \
+        _openai_tokens(messages, temperature, max_tokens)
+    parts = []
+    for token in tokens:
+        parts.append(token)
+        write({"phase": phase, "token": token})
+    return "".join(parts)
@@ -1,14 +1,6 @@
 from typing import Dict
-from core.settings import PROVIDER, CHAT_MODEL, OPENAI_API_KEY, OLLAMA_HOST, OLLAMA_CHAT_MODEL
-import requests
-
-_openai_client = None
-def _get_openai():
-    global _openai_client
-    if _openai_client is None:
-        from openai import OpenAI
-        _openai_client = OpenAI(api_key=OPENAI_API_KEY)
-    return _openai_client
+from nodes.llm import chat
+from nodes.table_engine import render_context
 
 def _history_to_messages(history: list[dict]) -> list[dict]:
     msgs = []
@@ -50,32 +42,11 @@ def llm_reflection(query: str, context: str, previous_answer: str, iteration: in
         f"Please improve this analysis based on the reflection criteria above."
     )
     
-    if PROVIDER == "ollama":
-        payload = {
-            "model": OLLAMA_CHAT_MODEL,
-            "messages": [
-                {"role": "system", "content": REFLECTION_PROMPT},
-                {"role": "user", "content": f"Context:\n{context}\n\n{reflection_query}"}
-            ],
-            "stream": False,
-            "options": {"temperature": 0.1}  # 성찰에서는 낮은 temperature
-        }
-        r = requests.post(f"{OLLAMA_HOST}/api/chat", json=payload, timeout=180)
-        r.raise_for_status()
-        return r.json()["message"]["content"]
-
-    # openai
-    client = _get_openai()
-    resp = client.chat.completions.create(
-        model=CHAT_MODEL,
-        messages=[
-            {"role": "system", "content": REFLECTION_PROMPT},
-            {"role": "user", "content": f"Context:\n{context}\n\n{reflection_query}"}
-        ],
-        temperature=0.1,
-        max_tokens=4000,
-    )
-    return resp.choices[0].message.content
+    # 성찰에서는 낮은 temperature, 개선본은 "reflection" 토큰으로 스트리밍 (UI가 초안을 교체)
+    return chat([
+        {"role": "system", "content": REFLECTION_PROMPT},
+        {"role": "user", "content": f"Context:\n{context}\n\n{reflection_query}"}
+    ], temperature=0.1, phase="reflection")
 
 def node_reflection_agent(state: Dict):
     """에너지 산업 분석 성찰 및 개선 에이전트 (1회 반복)"""
@@ -89,12 +60,8 @@ def node_reflection_agent(state: Dict):
     query = state.get("query", "")
     candidates = state.get("candidates", [])
     
-    # 컨텍스트 재구성
-    blocks = []
-    for i, c in enumerate(candidates[:8], 1):
-        src = f"[S{i}] {c.get('filename','N/A')} p.{c.get('page','N/A')}"
-        blocks.append(f"{src}\n{c.get('content','')}")
-    context = "\n\n".join(blocks)
+    # 에이전트가 만든 컨텍스트 재사용 (없으면 같은 렌더러로 생성)
+    context = state.get("context") or render_context(query, candidates)
     
     # 1회 성찰 수행
     previous_answer = result.get("answer", "")
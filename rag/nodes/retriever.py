@@ -1,8 +1,34 @@
 from typing import Dict
-from db.deps import vector_search
+from db.deps import vector_search, hybrid_search, avector_search, ahybrid_search
+
+def _search(state: Dict, filters):
+    c = state.get("categories") or state["category"]
+    emb = state["query_embedding"]
+    if state.get("hybrid"):
+        return hybrid_search(c, emb, state["query"], k=8, filters=filters)
+    return vector_search(c, emb, k=8, filters=filters)
 
 def node_retriever(state: Dict):
-    c = state["category"]
+    filters = state.get("filters")
+    state["candidates"] = _search(state, filters)
+    if not state["candidates"] and filters and any(filters.values()):
+        # 조건에 맞는 리포트가 없으면(메타데이터 없는 이전 적재분 포함) 전체 코퍼스에서 검색
+        print(f"⚠️ 필터 {filters} 결과 없음 → 필터 없이 재검색")
+        state["candidates"] = _search(state, None)
+    return state
+
+async def _asearch(state: Dict, filters):
+    c = state.get("categories") or state["category"]
     emb = state["query_embedding"]
-    state["candidates"] = vector_search(c, emb, k=8)
+    if state.get("hybrid"):
+        return await ahybrid_search(c, emb, state["query"], k=8, filters=filters)
+    return await avector_search(c, emb, k=8, filters=filters)
+
+async def anode_retriever(state: Dict):
+    """node_retriever의 async 버전"""
+    filters = state.get("filters")
+    state["candidates"] = await _asearch(state, filters)
+    if not state["candidates"] and filters and any(filters.values()):
+        print(f"⚠️ 필터 {filters} 결과 없음 → 필터 없이 재검색")
+        state["candidates"] = await _asearch(state, None)
     return state
@@ -1,30 +1,225 @@
-from typing import Dict
-from core.settings import PROVIDER, EMBED_MODEL, OPENAI_API_KEY, OLLAMA_HOST, OLLAMA_EMBED_MODEL
+from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+from core.settings import (
+    PROVIDER, EMBED_MODEL, OLLAMA_HOST, OLLAMA_EMBED_MODEL,
+    EMBED_BATCH_MAX_TOKENS, EMBED_BATCH_MAX_ITEMS, EMBED_CONCURRENCY, EMBED_DIM, HYBRID_SEARCH,
+)
+from core.clients import get_openai, get_async_openai
+from nodes import embed_cache
+from db.deps import known_brokers, available_categories, aknown_brokers, aavailable_categories
+from datetime import date
+import re
 import requests
 
-# OpenAI client (lazy import)
-_openai_client = None
-def _get_openai():
-    global _openai_client
-    if _openai_client is None:
-        from openai import OpenAI
-        _openai_client = OpenAI(api_key=OPENAI_API_KEY)
-    return _openai_client
+# tiktoken이 있으면 정확한 토큰 수, 없으면 UTF-8 바이트 기반으로 보수적으로 추정
+_encoder = None
+def _count_tokens(text: str) -> int:
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.encoding_for_model(EMBED_MODEL)
+        except Exception:
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text))
+    return len(text.encode("utf-8")) // 2 + 1
 
 OIL_HINTS = ["oil","petro","정유","opec","barrel"]
 PV_HINTS  = ["pv","solar","태양광","module","inverter"]
 
+# 출처를 직접 언급하면 해당 파티션만 검색
+SOURCE_HINTS = {
+    "NAVER": ["네이버", "naver", "증권사", "리서치"],
+    "PETRONET": ["페트로넷", "petronet"],
+    "RENEWABLE": ["재생에너지 리포트", "renewable report"],
+    "ENERGY_STAT": ["에너지통계", "에너지 통계", "energy stat"],
+}
+# 주제 힌트는 증권사 리포트(NAVER)에 해당 출처 파티션을 추가
+TOPIC_HINTS = {
+    "PETRONET": OIL_HINTS + ["유가", "원유", "석유", "휘발유", "경유"],
+    "RENEWABLE": PV_HINTS + ["재생", "풍력", "wind", "renewable", "rps"],
+    "ENERGY_STAT": ["통계", "statistics", "소비량", "생산량", "발전량", "수급"],
+}
+DEFAULT_CATEGORY = "NAVER"
+
+def pick_categories(q: str, available: List[str] | None = None) -> List[str]:
+    """
+    질의 → 검색할 파티션 목록.
+    출처 언급 > 주제 힌트(NAVER + 해당 출처) > 모호하면 전체 파티션 fan-out
+    """
+    ql = q.lower()
+    available = (available if available is not None else available_categories()) or [DEFAULT_CATEGORY]
+
+    named = [c for c, hints in SOURCE_HINTS.items() if any(h in ql for h in hints) and c in available]
+    if named:
+        return named
+
+    topical = [c for c, hints in TOPIC_HINTS.items() if any(h in ql for h in hints) and c in available]
+    if topical:
+        return ([DEFAULT_CATEGORY] if DEFAULT_CATEGORY in available else []) + topical
+    return available
+
 def pick_category(q: str) -> str:
-    return "NAVER"
+    return pick_categories(q)[0]
+
+# 티커/종목코드, 대문자 약어(OPEC, SMP), 숫자(연도, 수치), 따옴표로 묶은 구절 → 정확 매칭이 중요한 질의
+_EXACT_HINT_RE = re.compile(r"\b[A-Z]{2,}\b|\d|[\"'“”‘’]|\+")
+
+# ------------------ 메타데이터 필터 추출 ------------------
+# 기간 표현('10년간', '2020년 이후')은 발행 연도 조건이 아님
+_NOT_DURATION = r"(?!\s*년?도?\s*(?:간|동안|이후|후|뒤|만에))"
+# 2024 / 2024년 (금액 '2000억', 소수 '2024.5%' 제외), 두 자리는 명시적 표기만: '24 / '24년 / 24년도
+_YEAR_RE = re.compile(
+    r"(?<![\d.,])((?:19|20)\d{2})(?![\d%]|[.,]\d)(?!\s*(?:억|만|조|원))" + _NOT_DURATION
+    + r"|['‘’](\d{2})(?![\d%]|[.,]\d)" + _NOT_DURATION
+    + r"|(?<![\d.,])(\d{2})\s*년도"
+)
+_RELATIVE_YEARS = {"올해": 0, "금년": 0, "작년": -1, "전년": -1, "지난해": -1, "재작년": -2}
+_SOURCE_HINTS = {"naver_research": ["네이버", "naver"], "petronet": ["페트로넷", "petronet"]}
+
+def extract_years(q: str) -> List[int]:
+    """질의의 연도 표현 → [2024, ...] ('2024년', "'24년", '24년도', '작년' 등)"""
+    years = set()
+    for full, marked, suffixed in _YEAR_RE.findall(q):
+        years.add(int(full) if full else 2000 + int(marked or suffixed))
+    this_year = date.today().year
+    for word, offset in _RELATIVE_YEARS.items():
+        if word in q:
+            years.add(this_year + offset)
+    # '2030년 목표'처럼 미래 연도는 발행 연도(report_date) 조건이 아니라 전망 대상
+    return sorted(y for y in years if y <= this_year)
+
+def extract_filters(q: str, broker_names: List[str] | None = None) -> Dict[str, List]:
+    """질의에서 연도/출처/증권사 조건 추출 → vector_search(filters=...)"""
+    lowered = q.lower()
+    sources = [src for src, hints in _SOURCE_HINTS.items() if any(h in lowered for h in hints)]
+    brokers = []
+    for b in (broker_names if broker_names is not None else known_brokers()):
+        if b in q and not any(b in found for found in brokers):
+            brokers.append(b)
+    return {"years": extract_years(q), "sources": sources, "brokers": brokers}
+
+def wants_hybrid(q: str) -> bool:
+    """HYBRID_SEARCH=auto일 때 어휘 매칭을 섞을지 판단"""
+    if HYBRID_SEARCH == "always":
+        return True
+    if HYBRID_SEARCH == "never":
+        return False
+    return bool(_EXACT_HINT_RE.search(q or ""))
 
 def embed(text: str):
     # Always use OpenAI for embeddings
-    client = _get_openai()
+    cached = embed_cache.get_many(EMBED_MODEL, EMBED_DIM, [text])[0]
+    if cached is not None:
+        return cached
+    client = get_openai()
     resp = client.embeddings.create(model=EMBED_MODEL, input=text)
-    return resp.data[0].embedding
+    emb = resp.data[0].embedding
+    embed_cache.put_many(EMBED_MODEL, EMBED_DIM, [text], [emb])
+    return emb
+
+def _make_batches(texts: List[str]) -> List[List[int]]:
+    """입력 순서를 유지한 채 토큰/개수 상한을 넘지 않도록 인덱스 묶음을 만든다"""
+    batches, cur, cur_tokens = [], [], 0
+    for i, t in enumerate(texts):
+        n = _count_tokens(t)
+        if cur and (cur_tokens + n > EMBED_BATCH_MAX_TOKENS or len(cur) >= EMBED_BATCH_MAX_ITEMS):
+            batches.append(cur)
+            cur, cur_tokens = [], 0
+        cur.append(i)
+        cur_tokens += n
+    if cur:
+        batches.append(cur)
+    return batches
+
+def _embed_batch(inputs: List[str]) -> List[List[float]]:
+    client = get_openai()
+    resp = client.embeddings.create(model=EMBED_MODEL, input=inputs)
+    # 응답 순서는 보장되지 않으므로 index 기준으로 정렬
+    return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+def embed_many(texts: List[str]) -> List[List[float]]:
+    """여러 텍스트를 토큰 단위 배치로 묶어 동시에 임베딩. 결과는 입력 순서와 동일"""
+    if not texts:
+        return []
+    # 빈 문자열은 API가 거부하므로 공백 한 칸으로 대체
+    inputs = [t if t and t.strip() else " " for t in texts]
+
+    # 캐시에 없는 텍스트만 API로 요청 (같은 텍스트는 한 번만)
+    out: List[List[float]] = embed_cache.get_many(EMBED_MODEL, EMBED_DIM, inputs)
+    missing = list(dict.fromkeys(t for t, e in zip(inputs, out) if e is None))
+    if not missing:
+        return out
+
+    fetched: List[List[float]] = [None] * len(missing)
+    batches = _make_batches(missing)
+    workers = max(1, min(EMBED_CONCURRENCY, len(batches)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda idx: _embed_batch([missing[i] for i in idx]), batches)
+        for idx, embs in zip(batches, results):
+            for i, e in zip(idx, embs):
+                fetched[i] = e
+    embed_cache.put_many(EMBED_MODEL, EMBED_DIM, missing, fetched)
+
+    by_text = dict(zip(missing, fetched))
+    return [e if e is not None else by_text[t] for t, e in zip(inputs, out)]
+
+# ------------------ async 임베딩 ------------------
+async def _aembed_batch(inputs: List[str]) -> List[List[float]]:
+    resp = await get_async_openai().embeddings.create(model=EMBED_MODEL, input=inputs)
+    return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+async def aembed(text: str):
+    """embed의 async 버전 (sqlite 캐시 I/O는 이벤트 루프를 막지 않도록 스레드에서 실행)"""
+    cached = (await asyncio.to_thread(embed_cache.get_many, EMBED_MODEL, EMBED_DIM, [text]))[0]
+    if cached is not None:
+        return cached
+    emb = (await _aembed_batch([text]))[0]
+    await asyncio.to_thread(embed_cache.put_many, EMBED_MODEL, EMBED_DIM, [text], [emb])
+    return emb
+
+async def aembed_many(texts: List[str]) -> List[List[float]]:
+    """embed_many의 async 버전. 배치 요청을 EMBED_CONCURRENCY개까지 동시에 보냄"""
+    if not texts:
+        return []
+    inputs = [t if t and t.strip() else " " for t in texts]
+    out: List[List[float]] = await asyncio.to_thread(embed_cache.get_many, EMBED_MODEL, EMBED_DIM, inputs)
+    missing = list(dict.fromkeys(t for t, e in zip(inputs, out) if e is None))
+    if not missing:
+        return out
+
+    sem = asyncio.Semaphore(max(1, EMBED_CONCURRENCY))
+    async def _run(idx: List[int]):
+        async with sem:
+            return await _aembed_batch([missing[i] for i in idx])
+
+    batches = _make_batches(missing)
+    fetched: List[List[float]] = [None] * len(missing)
+    for idx, embs in zip(batches, await asyncio.gather(*(_run(idx) for idx in batches))):
+        for i, e in zip(idx, embs):
+            fetched[i] = e
+    await asyncio.to_thread(embed_cache.put_many, EMBED_MODEL, EMBED_DIM, missing, fetched)
+
+    by_text = dict(zip(missing, fetched))
+    return [e if e is not None else by_text[t] for t, e in zip(inputs, out)]
+
+def _route_state(state: Dict, q: str, emb, categories: List[str], filters: Dict):
+    state["query_embedding"] = emb
+    state["categories"] = categories
+    state["category"] = categories[0]
+    state["hybrid"] = wants_hybrid(q)
+    state["filters"] = filters
+    state["target_years"] = filters["years"]
+    return state
 
 def node_router(state: Dict):
     q = state["query"]
-    state["query_embedding"] = embed(q)
-    state["category"] = pick_category(q)
-    return state
+    return _route_state(state, q, embed(q), pick_categories(q), extract_filters(q))
+
+async def anode_router(state: Dict):
+    """node_router의 async 버전: 임베딩 요청과 파티션/증권사 조회를 동시에 수행"""
+    q = state["query"]
+    emb, available, brokers = await asyncio.gather(aembed(q), aavailable_categories(), aknown_brokers())
+    return _route_state(state, q, emb, pick_categories(q, available), extract_filters(q, brokers))
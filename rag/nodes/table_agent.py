@@ -1,14 +1,6 @@
-from typing import Dict, Any
-import pandas as pd
-from db.deps import load_structured_by_keys
-
-def _to_df(tj: Dict[str, Any]) -> pd.DataFrame:
-    cols = tj.get("columns", [])
-    rows = tj.get("rows", [])
-    df = pd.DataFrame(rows, columns=cols) if cols else pd.DataFrame(rows)
-    for col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="ignore")
-    return df
+from typing import Dict
+from nodes.table_engine import render_context
+from nodes.llm import chat
 
 def node_table_agent(state: Dict):
     """재생에너지분석전문가 - 신재생 기술, ESG, 투자 트렌드 분석"""
@@ -39,12 +31,9 @@ def node_table_agent(state: Dict):
         "and investment opportunities in renewable energy sectors.\n"
     )
     
-    # Tag context blocks with [S#] to enable inline citations in answers
-    blocks = []
-    for i, c in enumerate(cands[:8], 1):
-        src = f"[S{i}] {c.get('filename','N/A')} p.{c.get('page','N/A')}"
-        blocks.append(f"{src}\n{c.get('content','')}")
-    context = "\n\n".join(blocks)
+    # Tag context blocks with [S#] to enable inline citations in answers (표 청크는 계산 결과로 대체)
+    context = render_context(state.get("query", ""), cands)
+    state["context"] = context
     
     # 재생에너지분석전문가 답변 생성
     ans = llm_answer_renewable_energy(state.get("query", ""), context, state.get("history"), renewable_energy_prompt)
@@ -54,33 +43,7 @@ def node_table_agent(state: Dict):
 
 def llm_answer_renewable_energy(user_query: str, context: str, history: list[dict] | None = None, system_prompt: str = "") -> str:
     """재생에너지분석전문가 답변 생성"""
-    from core.settings import PROVIDER, CHAT_MODEL, OPENAI_API_KEY, OLLAMA_HOST, OLLAMA_CHAT_MODEL
-    import requests
-    
-    if PROVIDER == "ollama":
-        payload = {
-            "model": OLLAMA_CHAT_MODEL,
-            "messages": [
-                {"role":"system","content": system_prompt},
-                {"role":"user","content": f"Question:\n{user_query}\n\nContext:\n{context}"}
-            ],
-            "stream": False,
-            "options": {"temperature": 0.0}
-        }
-        r = requests.post(f"{OLLAMA_HOST}/api/chat", json=payload, timeout=180)
-        r.raise_for_status()
-        return r.json()["message"]["content"]
-
-    # openai
-    from openai import OpenAI
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    resp = client.chat.completions.create(
-        model=CHAT_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Question:\n{user_query}\n\nContext:\n{context}"}
-        ],
-        temperature=0.0,
-        max_tokens=4000,
-    )
-    return resp.choices[0].message.content
+    return chat([
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"Question:\n{user_query}\n\nContext:\n{context}"}
+    ], temperature=0.0)
@@ -0,0 +1,204 @@
+import re
+import threading
+from collections import OrderedDict
+import pandas as pd
+from core.settings import TABLE_ENGINE_ENABLED, TABLE_FRAME_CACHE_SIZE, TABLE_CONTEXT_ROWS
+from db.deps import load_structured_by_keys, lexical_terms
+
+# 검색된 표 청크(markdown)를 프롬프트에 통째로 넣는 대신, structured_tables의 JSON을 타입이 있는 DataFrame으로
+# 읽어 필터/집계/증감 계산을 여기서 하고 LLM에는 계산 결과와 관련 행만 짧게 넘긴다.
+
+# ------------------ 파싱 ------------------
+# 증권사 리포트 표 표기: 1,234.5 / (123) / △12.3 (음수) / 12.3% / 1.2배 / 3,000억원
+_NUM_RE = re.compile(r"^(\(?)([+\-△▽]?)(\d+(?:\.\d+)?)\)?(?:%p?|배|x|원|억원|조원|만원|bp)?$")
+_EMPTY = {"", "-", "–", "—", "n/a", "na", "nm", "n.a."}
+
+def parse_number(cell) -> float | None:
+    if isinstance(cell, (int, float)):
+        return float(cell)
+    s = str(cell or "").strip().replace(",", "").replace(" ", "")
+    if s.lower() in _EMPTY:
+        return None
+    m = _NUM_RE.match(s)
+    if not m:
+        return None
+    value = float(m.group(3))
+    return -value if m.group(1) or m.group(2) in ("-", "△", "▽") else value
+
+def _dedupe(names: list[str]) -> list[str]:
+    seen: dict[str, int] = {}
+    out = []
+    for i, n in enumerate(names):
+        n = n or f"col{i}"
+        seen[n] = seen.get(n, 0) + 1
+        out.append(n if seen[n] == 1 else f"{n}_{seen[n]}")
+    return out
+
+def to_frame(table_json: dict) -> pd.DataFrame:
+    """table_json({"columns", "rows"}) → 숫자 열은 float로 변환한 DataFrame"""
+    cols = [str("" if c is None else c).strip() for c in table_json.get("columns", [])]
+    width = len(cols) or max((len(r) for r in table_json.get("rows", [])), default=0)
+    # 빈 칸(None)은 "None" 문자열이 아니라 빈 문자열로 (숫자 열 변환 시 NaN)
+    rows = [[" ".join(str("" if v is None else v).split()) for v in (list(r) + [""] * width)[:width]]
+            for r in table_json.get("rows", [])]
+    df = pd.DataFrame(rows, columns=_dedupe(cols) if cols else None)
+    # camelot 결과는 열 이름이 0..n이고 첫 행이 실제 헤더
+    if len(df) > 1 and all(re.fullmatch(r"\d+", str(c)) for c in df.columns):
+        df.columns = _dedupe(list(df.iloc[0]))
+        df = df.iloc[1:].reset_index(drop=True)
+    for col in df.columns:
+        filled = df[col].str.strip().ne("").sum()
+        parsed = df[col].map(parse_number)
+        # 숫자로 읽히는 칸이 대부분이면 숫자 열 (빈칸/주석은 NaN)
+        if filled and parsed.notna().sum() >= 0.6 * filled:
+            df[col] = pd.to_numeric(parsed, errors="coerce")
+    return df
+
+# ------------------ DataFrame 캐시 ------------------
+# structured_tables.id 기준 (재적재 시 새 id로 들어가므로 오래된 항목은 LRU로 밀려남)
+_frames: OrderedDict[int, pd.DataFrame] = OrderedDict()
+_lock = threading.Lock()
+
+def _frame_of(table: dict) -> pd.DataFrame:
+    key = table["id"]
+    with _lock:
+        df = _frames.get(key)
+        if df is not None:
+            _frames.move_to_end(key)
+            return df
+    df = to_frame(table["table_json"] or {})
+    with _lock:
+        _frames[key] = df
+        while len(_frames) > TABLE_FRAME_CACHE_SIZE:
+            _frames.popitem(last=False)
+    return df
+
+def load_frames(keys: set[tuple[str, int]]) -> dict[tuple[str, int], list[tuple[str, pd.DataFrame]]]:
+    """(filename, page) → [(caption, DataFrame), ...]"""
+    frames: dict[tuple[str, int], list[tuple[str, pd.DataFrame]]] = {}
+    for t in sorted(load_structured_by_keys(keys), key=lambda t: t["id"]):
+        df = _frame_of(t)
+        if not df.empty:
+            frames.setdefault((t["doc_id"], t["page"]), []).append((t["caption"] or "Table", df))
+    return frames
+
+# ------------------ 질의 해석 ------------------
+_AGGS = {
+    "sum": ("합계", "총합", "합산", "총액", "누적", "sum", "total"),
+    "mean": ("평균", "average", "mean", "avg"),
+    "max": ("최대", "최고", "가장 높", "가장 많", "가장 큰", "max", "highest", "largest"),
+    "min": ("최소", "최저", "가장 낮", "가장 적", "가장 작", "min", "lowest", "smallest"),
+}
+_COMPARE = ("증가", "감소", "증감", "변화", "변동", "비교", "성장", "상승", "하락", "차이", "대비",
+            "yoy", "qoq", "growth", "change", "compare", " vs")
+_NUMERIC_HINTS = ("얼마", "몇", "수치", "규모", "비중", "%", "억", "조", "톤", "배럴", "mw", "gw", "kwh")
+
+def detect_ops(query: str) -> dict:
+    ql = (query or "").lower()
+    aggs = [name for name, hints in _AGGS.items() if any(h in ql for h in hints)]
+    return {"aggs": aggs, "compare": any(h in ql for h in _COMPARE)}
+
+def is_numeric_question(query: str) -> bool:
+    ops = detect_ops(query)
+    ql = (query or "").lower()
+    return bool(ops["aggs"] or ops["compare"] or any(h in ql for h in _NUMERIC_HINTS))
+
+# ------------------ 계산 ------------------
+def _fmt(v) -> str:
+    if pd.isna(v):
+        return "-"
+    return f"{v:,.0f}" if float(v).is_integer() else f"{v:,.2f}"
+
+def _label_column(df: pd.DataFrame) -> str | None:
+    return next((c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])), None)
+
+def _select(df: pd.DataFrame, terms: list[str]) -> tuple[pd.DataFrame, list[str]]:
+    """질의 용어로 행(라벨 열)과 숫자 열(열 이름, 예: 2024)을 좁힘. 맞는 것이 없으면 전체"""
+    label = _label_column(df)
+    numeric = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    lowered = [t.lower() for t in terms]
+    cols = [c for c in numeric if any(t in str(c).lower() for t in lowered)] or numeric
+    rows = df
+    if label is not None and lowered:
+        mask = df[label].str.lower().map(lambda s: any(t in s for t in lowered))
+        if mask.any():
+            rows = df[mask]
+    return rows, cols
+
+def summarize(df: pd.DataFrame, caption: str, query: str, max_rows: int = TABLE_CONTEXT_ROWS) -> str:
+    """표 하나 → 관련 행 미리보기 + 질의가 요구한 집계/증감 결과 (몇 줄짜리 텍스트)"""
+    terms = lexical_terms(query)
+    ops = detect_ops(query)
+    label = _label_column(df)
+    rows, cols = _select(df, terms)
+    lines = [f"{caption} ({len(df)} rows × {len(df.columns)} cols"
+             + (f", {len(rows)} matching" if len(rows) < len(df) else "") + ")"]
+
+    shown = [c for c in ([label] if label else []) + cols if c is not None] or list(df.columns)
+    lines.append(rows[shown].head(max_rows).to_csv(index=False, float_format="%.4g").strip())
+    if len(rows) > max_rows:
+        lines.append(f"... (+{len(rows) - max_rows} rows)")
+
+    values = rows[cols] if cols else None
+    if values is not None and not values.empty:
+        for agg in ops["aggs"]:
+            if agg in ("sum", "mean"):
+                result = values.agg(agg)
+                lines.append(f"{agg}: " + ", ".join(f"{c}={_fmt(v)}" for c, v in result.items()))
+            else:
+                picks = []
+                for c in cols:
+                    if values[c].notna().any():
+                        idx = values[c].idxmax() if agg == "max" else values[c].idxmin()
+                        name = rows.at[idx, label] if label else idx
+                        picks.append(f"{c}={_fmt(values.at[idx, c])} ({name})")
+                lines.append(f"{agg}: " + ", ".join(picks))
+        if ops["compare"] and len(cols) >= 2:
+            # 열이 시계열(왼쪽 → 오른쪽)이라고 보고 마지막 두 열의 증감
+            a, b = cols[-2], cols[-1]
+            diff = values[b] - values[a]
+            pct = diff / values[a].abs().where(values[a] != 0) * 100
+            for idx in rows.index[:max_rows]:
+                name = rows.at[idx, label] if label else idx
+                lines.append(f"change {a}→{b} {name}: {_fmt(values.at[idx, a])} → {_fmt(values.at[idx, b])} "
+                             f"({diff[idx]:+,.2f}" + (f", {pct[idx]:+.1f}%)" if pd.notna(pct[idx]) else ")"))
+    return "\n".join(lines)
+
+# ------------------ 프롬프트 컨텍스트 (에이전트 공용) ------------------
+def render_context(query: str, cands: list[dict], limit: int = 8) -> str:
+    """
+    [S#] 태그 컨텍스트. 표 청크는 structured_tables에서 계산한 요약으로 대체하고,
+    수치 질문이면 본문 청크 페이지에 있는 표의 계산 결과도 덧붙인다.
+    """
+    cands = cands[:limit]
+    frames = {}
+    if TABLE_ENGINE_ENABLED and cands:
+        numeric = is_numeric_question(query)
+        keys = {(c.get("filename"), c.get("page")) for c in cands
+                if c.get("chunk_type") == "table" or numeric}
+        keys = {k for k in keys if k[0] and k[1] is not None}
+        if keys:
+            try:
+                frames = load_frames(keys)
+            except Exception as e:
+                # 표 계산은 부가 기능: 실패해도 원문 청크로 답변
+                print(f"⚠️ 표 엔진 실패, 원문 표 사용: {e}")
+
+    blocks, done = [], set()
+    for i, c in enumerate(cands, 1):
+        src = f"[S{i}] {c.get('filename','N/A')} p.{c.get('page','N/A')}"
+        key = (c.get("filename"), c.get("page"))
+        tables = frames.get(key) if key not in done else None
+        if c.get("chunk_type") == "table" and key in done:
+            blocks.append(f"{src}\n(same page as an earlier table; see computed results above)")
+            continue
+        if tables:
+            done.add(key)
+            computed = "\n\n".join(summarize(df, caption, query) for caption, df in tables)
+            if c.get("chunk_type") == "table":
+                blocks.append(f"{src}\n{computed}")
+            else:
+                blocks.append(f"{src}\n{c.get('content','')}\n\nTables on this page (computed):\n{computed}")
+            continue
+        blocks.append(f"{src}\n{c.get('content','')}")
+    return "\n\n".join(blocks)
@@ -1,19 +1,11 @@
 from typing import Dict
-from core.settings import PROVIDER, CHAT_MODEL, OPENAI_API_KEY, OLLAMA_HOST, OLLAMA_CHAT_MODEL
-import requests
+from nodes.llm import chat
+from nodes.table_engine import render_context
 from langchain import hub
 from langchain_teddynote.messages import stream_response
 import io
 import sys
 
-_openai_client = None
-def _get_openai():
-    global _openai_client
-    if _openai_client is None:
-        from openai import OpenAI
-        _openai_client = OpenAI(api_key=OPENAI_API_KEY)
-    return _openai_client
-
 SYSTEM_PROMPT = (
     "You are a thorough energy-market analyst.\n"
     "Answer ONLY using the provided context documents.\n"
@@ -123,34 +115,11 @@ def llm_answer(user_query: str, context: str, history: list[dict] | None = None)
         "state: 'This information is not available in the provided documents.'\n"
     )
     
-    if PROVIDER == "ollama":
-        payload = {
-            "model": OLLAMA_CHAT_MODEL,
-            "messages": [
-                {"role":"system","content": energy_analyst_prompt},
-                *(_history_to_messages(history)),
-                {"role":"user","content": f"Question:\n{user_query}\n\nContext:\n{context}"}
-            ],
-            "stream": False,
-            "options": {"temperature": 0.0}
-        }
-        r = requests.post(f"{OLLAMA_HOST}/api/chat", json=payload, timeout=180)
-        r.raise_for_status()
-        return r.json()["message"]["content"]
-
-    # openai
-    client = _get_openai()
-    resp = client.chat.completions.create(
-        model=CHAT_MODEL,
-        messages=[
-            {"role": "system", "content": energy_analyst_prompt},
-            *(_history_to_messages(history)),
-            {"role": "user", "content": f"Question:\n{user_query}\n\nContext:\n{context}"}
-        ],
-        temperature=0.0,
-        max_tokens=4000,
-    )
-    return resp.choices[0].message.content
+    return chat([
+        {"role": "system", "content": energy_analyst_prompt},
+        *(_history_to_messages(history)),
+        {"role": "user", "content": f"Question:\n{user_query}\n\nContext:\n{context}"}
+    ], temperature=0.0)
 
 def node_text_agent(state: Dict):
     """에너지산업분석전문가 - 전통 에너지, 정책, 시장 분석"""
@@ -180,12 +149,9 @@ def node_text_agent(state: Dict):
         "and investment insights for traditional energy sectors.\n"
     )
     
-    # Tag context blocks with [S#] to enable inline citations in answers
-    blocks = []
-    for i, c in enumerate(cands[:8], 1):
-        src = f"[S{i}] {c.get('filename','N/A')} p.{c.get('page','N/A')}"
-        blocks.append(f"{src}\n{c.get('content','')}")
-    context = "\n\n".join(blocks)
+    # Tag context blocks with [S#] to enable inline citations in answers (표 청크는 계산 결과로 대체)
+    context = render_context(state.get("query", ""), cands)
+    state["context"] = context
     
     # 에너지산업분석전문가 답변 생성
     ans = llm_answer_energy_industry(state.get("query", ""), context, state.get("history"), energy_industry_prompt)
@@ -195,31 +161,8 @@ def node_text_agent(state: Dict):
 
 def llm_answer_energy_industry(user_query: str, context: str, history: list[dict] | None = None, system_prompt: str = "") -> str:
     """에너지산업분석전문가 답변 생성"""
-    if PROVIDER == "ollama":
-        payload = {
-            "model": OLLAMA_CHAT_MODEL,
-            "messages": [
-                {"role":"system","content": system_prompt},
-                *(_history_to_messages(history)),
-                {"role":"user","content": f"Question:\n{user_query}\n\nContext:\n{context}"}
-            ],
-            "stream": False,
-            "options": {"temperature": 0.0}
-        }
-        r = requests.post(f"{OLLAMA_HOST}/api/chat", json=payload, timeout=180)
-        r.raise_for_status()
-        return r.json()["message"]["content"]
-
-    # openai
-    client = _get_openai()
-    resp = client.chat.completions.create(
-        model=CHAT_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            *(_history_to_messages(history)),
-            {"role": "user", "content": f"Question:\n{user_query}\n\nContext:\n{context}"}
-        ],
-        temperature=0.0,
-        max_tokens=4000,
-    )
-    return resp.choices[0].message.content
+    return chat([
+        {"role": "system", "content": system_prompt},
+        *(_history_to_messages(history)),
+        {"role": "user", "content": f"Question:\n{user_query}\n\nContext:\n{context}"}
+    ], temperature=0.0)
@@ -4,8 +4,16 @@ class QAState(TypedDict, total=False):
     query: str
     query_embedding: List[float]
     category: str
+    categories: List[str]
+    hybrid: bool
+    filters: Dict[str, Any]
+    target_years: List[int]
+    history: List[Dict[str, Any]]
     candidates: List[Dict[str, Any]]
+    context: str
     intent: Dict[str, Any]
     route: str
     result: Dict[str, Any]
-    final: str
\ No newline at end of file
+    final: str
+    cache_hit: bool
+    answer_cache_id: int
\ No newline at end of file